@@ -0,0 +1,97 @@
+"""Компактная сериализация моделей для API.
+
+Каждое поле ресурса описано колонками, которые нужны для его значения,
+и функцией, достающей значение из объекта. По запрошенным через
+``?fields=`` полям строится ``select_related``/``only``, поэтому в базу
+уходит один запрос на страницу и только нужные колонки.
+"""
+from collections import namedtuple
+
+Field = namedtuple('Field', ('columns', 'value'))
+
+
+def _date(value):
+    return value.isoformat()
+
+
+def _file(value):
+    return value.url if value else None
+
+
+class Resource:
+    def __init__(self, fields, default=None):
+        self.fields = fields
+        self.default = tuple(default or fields)
+
+    def parse_fields(self, raw):
+        """Список полей из ``?fields=``; ValueError для неизвестных."""
+
+        if not raw:
+            return self.default
+        names = tuple(name.strip() for name in raw.split(',') if name)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(
+                f"Неизвестные поля: {', '.join(unknown)}. "
+                f"Доступны: {', '.join(self.fields)}"
+            )
+        return names or self.default
+
+    def prepare(self, queryset, names, *extra):
+        """Выборка только колонок для ``names`` и ключа паджинации."""
+
+        columns = list(extra)
+        for name in names:
+            columns.extend(self.fields[name].columns)
+        related = {
+            column.rsplit('__', 1)[0] for column in columns if '__' in column
+        }
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        return queryset.only(*columns or ('pk',))
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].value(obj) for name in names}
+
+
+POST = Resource({
+    'id': Field((), lambda post: post.pk),
+    'text': Field(('text',), lambda post: post.text),
+    'pub_date': Field(('pub_date',), lambda post: _date(post.pub_date)),
+    'author': Field(
+        ('author__username',), lambda post: post.author.username
+    ),
+    'group': Field(
+        ('group__slug',),
+        lambda post: post.group.slug if post.group else None
+    ),
+    'image': Field(('image',), lambda post: _file(post.image)),
+    'comments_count': Field(
+        ('comments_count',), lambda post: post.comments_count
+    ),
+})
+
+GROUP = Resource({
+    'id': Field((), lambda group: group.pk),
+    'slug': Field(('slug',), lambda group: group.slug),
+    'title': Field(('title',), lambda group: group.title),
+    'description': Field(('description',), lambda group: group.description),
+})
+
+COMMENT = Resource({
+    'id': Field((), lambda comment: comment.pk),
+    'post': Field(('post',), lambda comment: comment.post_id),
+    'author': Field(
+        ('author__username',), lambda comment: comment.author.username
+    ),
+    'text': Field(('text',), lambda comment: comment.text),
+    'created': Field(('created',), lambda comment: _date(comment.created)),
+})
+
+FOLLOW = Resource({
+    'id': Field((), lambda follow: follow.pk),
+    'user': Field(('user__username',), lambda follow: follow.user.username),
+    'author': Field(
+        ('author__username',), lambda follow: follow.author.username
+    ),
+})
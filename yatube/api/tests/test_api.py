@@ -0,0 +1,140 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import archive
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class TestApi(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.reader = User.objects.create_user(username='HasName')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test',
+            description='test desc'
+        )
+        for i in range(15):
+            Post.objects.create(
+                text=f'test text {i}', author=cls.author,
+                group=cls.group if i % 2 else None
+            )
+        cls.post = Post.objects.order_by('-pub_date', '-pk')[0]
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'comment {i}'
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def test_post_cursor_pages(self):
+        """ Тестирование курсорной паджинации постов """
+
+        url = reverse('api:post_list')
+        with self.assertNumQueries(1):
+            first = self.client.get(url, {'limit': 10}).json()
+        self.assertEqual(
+            [post['id'] for post in first['results']], self.expected[:10]
+        )
+        self.assertEqual(first['results'][0]['author'], 'HasNoName')
+        second = self.client.get(first['next']).json()
+        self.assertEqual(
+            [post['id'] for post in second['results']], self.expected[10:]
+        )
+        self.assertIsNone(second['next'])
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_fields_and_filters(self):
+        """ Тестирование ?fields= и фильтров по группе и автору """
+
+        response = self.client.get(reverse('api:post_list'), {
+            'fields': 'id,group', 'group': 'test', 'limit': 100,
+        })
+        results = response.json()['results']
+        self.assertEqual(len(results), 7)
+        self.assertEqual(results[0], {'id': results[0]['id'], 'group': 'test'})
+        response = self.client.get(
+            reverse('api:post_list'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['detail'])
+
+    def test_details_and_comments(self):
+        """ Тестирование отдельных объектов и комментариев """
+
+        post = self.client.get(
+            reverse('api:post_detail', args=(self.post.pk,))
+        ).json()
+        self.assertEqual(post['text'], self.post.text)
+        self.assertEqual(post['comments_count'], 3)
+        group = self.client.get(
+            reverse('api:group_detail', args=('test',)),
+            {'fields': 'title'}
+        ).json()
+        self.assertEqual(group, {'title': 'test group'})
+        url = reverse('api:comment_list', args=(self.post.pk,))
+        first = self.client.get(url, {'limit': 2}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(
+            [c['text'] for c in first['results'] + second['results']],
+            ['comment 0', 'comment 1', 'comment 2']
+        )
+        self.assertIsNone(second['next'])
+        missing = self.client.get(reverse('api:post_detail', args=(0,)))
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(missing.json(), {'detail': 'Не найдено.'})
+
+    def test_archived_posts(self):
+        """ Тестирование выдачи постов, перенесенных в архив """
+
+        archive.archive_batch(timezone.now(), batch_size=10)
+        self.assertEqual(Post.objects.count(), 5)
+        url = reverse('api:post_list')
+        first = self.client.get(url, {'limit': 10}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(
+            [post['id'] for post in first['results'] + second['results']],
+            self.expected
+        )
+        archive.archive_batch(timezone.now(), batch_size=5)
+        post = self.client.get(
+            reverse('api:post_detail', args=(self.post.pk,))
+        ).json()
+        self.assertEqual(post['text'], self.post.text)
+        comments = self.client.get(
+            reverse('api:comment_list', args=(self.post.pk,))
+        ).json()
+        self.assertEqual(
+            [c['text'] for c in comments['results']],
+            ['comment 0', 'comment 1', 'comment 2']
+        )
+
+    def test_follows(self):
+        """ Тестирование подписок: только для авторизованных """
+
+        url = reverse('api:follow_list')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        client = Client()
+        client.force_login(self.reader)
+        self.assertEqual(
+            client.get(url, {'fields': 'user,author'}).json()['results'],
+            [{'user': 'HasName', 'author': 'HasNoName'}]
+        )
+        self.assertEqual(client.post(url).status_code, 405)
+
+
+if __name__ == '__main__':
+    unittest.main()
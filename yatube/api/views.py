@@ -0,0 +1,153 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from posts.models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                          Group, Post)
+from posts.utils import CursorPaginator, dump_token, load_token
+
+from . import serializers
+
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def error(detail, status):
+    return JsonResponse(
+        {'detail': detail}, status=status, json_dumps_params=JSON_PARAMS
+    )
+
+
+def api_view(view):
+    """Только GET, ошибки в виде JSON вместо HTML-страниц."""
+
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return error('Не найдено.', 404)
+        except ValueError as exc:
+            return error(str(exc), 400)
+    return wrapper
+
+
+def page_size(request):
+    try:
+        limit = int(request.GET.get('limit', settings.POSTS_AMOUNT))
+    except ValueError:
+        raise ValueError('limit должен быть числом.')
+    return max(1, min(limit, settings.API_MAX_LIMIT))
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def respond(request, resource, names, objects, next_cursor=None,
+            previous_cursor=None):
+    return JsonResponse({
+        'results': [resource.serialize(obj, names) for obj in objects],
+        'next': page_url(request, next_cursor),
+        'previous': page_url(request, previous_cursor),
+    }, json_dumps_params=JSON_PARAMS)
+
+
+def keyset(request, resource, queryset):
+    """Страница по возрастанию id: курсор хранит последний выданный id."""
+
+    names = resource.parse_fields(request.GET.get('fields'))
+    queryset = resource.prepare(queryset, names).order_by('pk')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            queryset = queryset.filter(pk__gt=int(load_token(cursor)))
+        except (ValueError, TypeError):
+            raise ValueError('Испорченный курсор.')
+    limit = page_size(request)
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = dump_token(rows[-1].pk)
+    return respond(request, resource, names, rows, next_cursor)
+
+
+def detail(request, resource, queryset, **lookup):
+    names = resource.parse_fields(request.GET.get('fields'))
+    obj = get_object_or_404(resource.prepare(queryset, names), **lookup)
+    return JsonResponse(
+        resource.serialize(obj, names), json_dumps_params=JSON_PARAMS
+    )
+
+
+@api_view
+def post_list(request):
+    resource = serializers.POST
+    names = resource.parse_fields(request.GET.get('fields'))
+    filters = {}
+    if 'group' in request.GET:
+        filters['group__slug'] = request.GET['group']
+    if 'author' in request.GET:
+        filters['author__username'] = request.GET['author']
+    posts = resource.prepare(
+        Post.objects.filter(**filters), names, 'pub_date'
+    ).with_archive(
+        resource.prepare(ArchivedPost.objects.all(), names, 'pub_date'),
+        **filters
+    )
+    paginator = CursorPaginator(posts, page_size(request))
+    page = paginator.cursor_page(request.GET.get('cursor'))
+    return respond(
+        request, resource, names, page, page.next_cursor,
+        page.previous_cursor
+    )
+
+
+@api_view
+def post_detail(request, post_id):
+    try:
+        return detail(
+            request, serializers.POST, Post.objects.all(), pk=post_id
+        )
+    except Http404:
+        return detail(
+            request, serializers.POST, ArchivedPost.objects.all(), pk=post_id
+        )
+
+
+@api_view
+def comment_list(request, post_id):
+    comments = Comment.objects.all()
+    if not Post.objects.filter(pk=post_id).exists():
+        get_object_or_404(ArchivedPost.objects.only('pk'), pk=post_id)
+        comments = ArchivedComment.objects.all()
+    return keyset(
+        request, serializers.COMMENT, comments.filter(post=post_id)
+    )
+
+
+@api_view
+def group_list(request):
+    return keyset(request, serializers.GROUP, Group.objects.all())
+
+
+@api_view
+def group_detail(request, slug):
+    return detail(request, serializers.GROUP, Group.objects.all(), slug=slug)
+
+
+@api_view
+def follow_list(request):
+    if not request.user.is_authenticated:
+        return error('Требуется авторизация.', 401)
+    return keyset(
+        request, serializers.FOLLOW, Follow.objects.filter(user=request.user)
+    )
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .jobs import autodiscover
+        autodiscover()
+        if settings.TEMPLATE_WARMUP:
+            from .warmup import warm
+            warm()
@@ -0,0 +1,164 @@
+from threading import Lock
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .serializers import CompactSerializer
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def get_pool(url, **options):
+    """Один пул соединений на адрес сервера для всех потоков процесса."""
+
+    key = (url, tuple(sorted(options.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = redis.ConnectionPool.from_url(url, **options)
+        return _pools[key]
+
+
+class RedisCache(BaseCache):
+    """Общий для всех воркеров кэш на Redis-совместимом сервере.
+
+    OPTIONS:
+        MAX_CONNECTIONS - размер пула соединений процесса;
+        SOCKET_TIMEOUT - таймаут операций, секунды;
+        COMPRESS_THRESHOLD - длина, с которой значения сжимаются
+        (0 отключает сжатие);
+        COMPRESS_LEVEL - уровень сжатия zlib.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        if redis is None:
+            raise ImportError('RedisCache требует установленный пакет redis')
+        if isinstance(server, (list, tuple)):
+            server = server[0]
+        options = params.get('OPTIONS', {})
+        self._server = server
+        self._pool_options = {
+            'max_connections': options.get('MAX_CONNECTIONS', 50),
+            'socket_timeout': options.get('SOCKET_TIMEOUT', 1),
+        }
+        self._serializer = CompactSerializer(
+            compress_threshold=options.get('COMPRESS_THRESHOLD', 1024),
+            compress_level=options.get('COMPRESS_LEVEL', 6),
+        )
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis(
+                connection_pool=get_pool(self._server, **self._pool_options)
+            )
+        return self._client
+
+    def _ttl(self, timeout):
+        """Таймаут Django в миллисекунды для PX; None - без срока."""
+
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(int(timeout * 1000), 0)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        if ttl == 0:
+            return False
+        return bool(self.client.set(
+            self._key(key, version), self._serializer.dumps(value),
+            px=ttl, nx=True
+        ))
+
+    def get(self, key, default=None, version=None):
+        value = self.client.get(self._key(key, version))
+        if value is None:
+            return default
+        return self._serializer.loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        key = self._key(key, version)
+        if ttl == 0:
+            self.client.delete(key)
+            return
+        self.client.set(key, self._serializer.dumps(value), px=ttl)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        key = self._key(key, version)
+        if ttl is None:
+            return bool(self.client.persist(key)) or bool(
+                self.client.exists(key)
+            )
+        if ttl == 0:
+            return bool(self.client.delete(key))
+        return bool(self.client.pexpire(key, ttl))
+
+    def delete(self, key, version=None):
+        self.client.delete(self._key(key, version))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget([self._key(key, version) for key in keys])
+        return {
+            key: self._serializer.loads(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in data.items():
+            key = self._key(key, version)
+            if ttl == 0:
+                pipe.delete(key)
+            else:
+                pipe.set(key, self._serializer.dumps(value), px=ttl)
+        pipe.execute()
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self.client.delete(*keys)
+
+    def has_key(self, key, version=None):
+        return bool(self.client.exists(self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if not self.client.exists(key):
+            raise ValueError("Key '%s' not found" % key)
+        try:
+            return self.client.incrby(key, delta)
+        except redis.ResponseError as error:
+            raise ValueError(str(error))
+
+    def clear(self):
+        if not self.key_prefix:
+            self.client.flushdb()
+            return
+        pattern = f'{self.key_prefix}:*'
+        keys = list(self.client.scan_iter(match=pattern, count=1000))
+        if keys:
+            self.client.delete(*keys)
+
+    def close(self, **kwargs):
+        """Соединения остаются в пуле процесса между запросами."""
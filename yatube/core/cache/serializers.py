@@ -0,0 +1,41 @@
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+JSON = b'j'
+COMPRESSED = b'z'
+
+
+class CompactSerializer:
+    """Сериализация значений кэша без pickle.
+
+    Целые числа хранятся как есть, чтобы INCR выполнялся на сервере.
+    Остальное кодируется в JSON, а длинные значения сжимаются zlib.
+    Поддерживаются только JSON-совместимые значения.
+    """
+
+    def __init__(self, compress_threshold=1024, compress_level=6):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def dumps(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode()
+        data = json.dumps(
+            value, cls=DjangoJSONEncoder, separators=(',', ':'),
+            ensure_ascii=False
+        ).encode()
+        if self.compress_threshold and len(data) >= self.compress_threshold:
+            return COMPRESSED + zlib.compress(data, self.compress_level)
+        return JSON + data
+
+    def loads(self, data):
+        if data is None:
+            return None
+        marker, payload = data[:1], data[1:]
+        if marker == COMPRESSED:
+            return json.loads(zlib.decompress(payload).decode())
+        if marker == JSON:
+            return json.loads(payload.decode())
+        return int(data)
@@ -0,0 +1,160 @@
+"""Нагрузочный прогон SQLite: читатели и писатели одновременно.
+
+Каждый профиль получает свой файл базы с таблицами, похожими на посты
+и ленты. Читатели в своих потоках выбирают страницу ленты, писатели
+в транзакции добавляют пост и раскладывают его по лентам подписчиков,
+как ``post_create``. Сравнение профилей показывает, что дают настройки
+``core.db.sqlite3`` по сравнению со стандартным бэкендом. После
+каждой операции соединение проверяется, как в конце запроса: с
+``CONN_MAX_AGE = 0`` оно закрывается и открывается заново.
+"""
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.db import OperationalError, connections, transaction
+
+PROFILES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+    },
+    'tuned': {
+        'ENGINE': 'core.db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
+}
+FOLLOWERS = 5
+SCHEMA = (
+    'CREATE TABLE bench_post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'text TEXT, pub_date REAL)',
+    'CREATE INDEX bench_post_date ON bench_post (pub_date)',
+    'CREATE TABLE bench_timeline (user_id INTEGER, post_id INTEGER, '
+    'pub_date REAL)',
+    'CREATE INDEX bench_timeline_user ON bench_timeline (user_id, pub_date)',
+)
+READ_SQL = (
+    'SELECT id, author_id, text, pub_date FROM bench_post '
+    'ORDER BY pub_date DESC, id DESC LIMIT 11',
+    'SELECT post_id FROM bench_timeline WHERE user_id = %s '
+    'ORDER BY pub_date DESC LIMIT 11',
+)
+
+
+def _alias(profile):
+    return f'bench_{profile}'
+
+
+def prepare(profile, directory, rows):
+    """Регистрирует соединение профиля и заполняет его базу."""
+
+    alias = _alias(profile)
+    path = os.path.join(directory, f'{profile}.sqlite3')
+    connections.databases[alias] = {**PROFILES[profile], 'NAME': path}
+    connections.ensure_defaults(alias)
+    connection = connections[alias]
+    with transaction.atomic(using=alias), connection.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        now = time.time()
+        cursor.executemany(
+            'INSERT INTO bench_post (author_id, text, pub_date) '
+            'VALUES (%s, %s, %s)',
+            [(i % 100, f'Запись {i}', now - rows + i) for i in range(rows)]
+        )
+    return alias
+
+
+def release(alias):
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+def _read(alias, rng):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(READ_SQL[0])
+        cursor.fetchall()
+        cursor.execute(READ_SQL[1], [rng.randrange(100)])
+        cursor.fetchall()
+
+
+def _write(alias, rng):
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            author = rng.randrange(100)
+            now = time.time()
+            cursor.execute(
+                'INSERT INTO bench_post (author_id, text, pub_date) '
+                'VALUES (%s, %s, %s)', [author, 'Нагрузочный пост', now]
+            )
+            post = cursor.lastrowid
+            cursor.executemany(
+                'INSERT INTO bench_timeline (user_id, post_id, pub_date) '
+                'VALUES (%s, %s, %s)',
+                [((author + n) % 100, post, now)
+                 for n in range(1, FOLLOWERS + 1)]
+            )
+
+
+OPERATIONS = {'read': _read, 'write': _write}
+
+
+def _worker(alias, kind, deadline, seed, results, lock):
+    operation = OPERATIONS[kind]
+    rng = random.Random(seed)
+    latencies = []
+    errors = 0
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                operation(alias, rng)
+            except OperationalError:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+            connections[alias].close_if_unusable_or_obsolete()
+    finally:
+        connections[alias].close()
+    with lock:
+        results[kind]['latencies'] += latencies
+        results[kind]['errors'] += errors
+
+
+def run(alias, readers=8, writers=2, duration=3.0):
+    """Гоняет потоки ``duration`` секунд; вернет сводку по чтению/записи."""
+
+    results = defaultdict(lambda: {'latencies': [], 'errors': 0})
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(
+            alias, kind, deadline, index, results, lock
+        ))
+        for index, kind in enumerate(['read'] * readers + ['write'] * writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = {}
+    for kind in OPERATIONS:
+        latencies = sorted(results[kind]['latencies'])
+        summary[kind] = {
+            'per_second': round(len(latencies) / duration, 1),
+            'p95_ms': round(
+                latencies[int(len(latencies) * 0.95)] * 1000, 2
+            ) if latencies else None,
+            'errors': results[kind]['errors'],
+        }
+    return summary
+
+
+def journal(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        return cursor.fetchone()[0]
@@ -0,0 +1,92 @@
+"""Чтение лент с реплик и возврат к основной базе после записи.
+
+Запросы представлений, помеченных ``replica_reads``, читают с одной из
+``DATABASE_REPLICAS`` (своей на весь запрос); все остальное, включая
+любую запись, идет в ``default``. Реплика может отставать, поэтому
+клиент, который что-то записал, получает cookie ``PRIMARY_PIN_COOKIE``
+и следующие ``REPLICA_PIN_SECONDS`` секунд читает с основной базы —
+свои новые посты и комментарии он видит сразу. Запись посреди
+запроса переключает на основную базу и оставшееся чтение этого
+запроса.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY_PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_current = ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+@contextmanager
+def tracking_writes():
+    """Состояние маршрутизации на время запроса."""
+
+    state = RoutingState()
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+
+
+def read_alias():
+    """Алиас, с которого сейчас читаются данные.
+
+    Входит в ключи общих кэшей: страница, собранная по отстающей
+    реплике, не должна достаться тому, кто читает с основной базы.
+    """
+
+    state = _current.get()
+    if state is not None and state.replica and not state.wrote:
+        return state.replica
+    return 'default'
+
+
+def replica_reads(view):
+    """Представление только читает и может читать с реплики."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _current.get()
+        replicas = settings.DATABASE_REPLICAS
+        if (state is not None and replicas
+                and request.method in SAFE_METHODS
+                and PRIMARY_PIN_COOKIE not in request.COOKIES):
+            state.replica = random.choice(replicas)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                state.replica = None
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы: объекты с разных алиасов
+        # ссылаются на одни и те же строки.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,61 @@
+"""SQLite с настройками для одновременных читателей и писателей.
+
+ENGINE = 'core.db.sqlite3'. Каждое новое соединение получает PRAGMA из
+``DEFAULT_PRAGMAS``, переопределяемые через ``OPTIONS['pragmas']``:
+журнал WAL (читатели не ждут писателя), ``synchronous=NORMAL`` (fsync
+только на контрольных точках WAL), отображение файла в память, кэш
+страниц и ожидание блокировки вместо немедленного «database is
+locked». ``OPTIONS['transaction_mode'] = 'IMMEDIATE'`` открывает
+транзакции ``atomic`` сразу с блокировкой записи: отложенная
+транзакция, начавшая с чтения, в WAL не может дождаться блокировки и
+падает с SQLITE_BUSY.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+OWN_OPTIONS = ('pragmas', 'transaction_mode')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for option in OWN_OPTIONS:
+            params.pop(option, None)
+        return params
+
+    @property
+    def pragmas(self):
+        return {
+            **DEFAULT_PRAGMAS,
+            **self.settings_dict['OPTIONS'].get('pragmas', {}),
+        }
+
+    @property
+    def transaction_mode(self):
+        mode = self.settings_dict['OPTIONS'].get(
+            'transaction_mode', 'DEFERRED'
+        ).upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'transaction_mode должен быть одним из {TRANSACTION_MODES}'
+            )
+        return mode
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if value is not None:
+                connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,199 @@
+"""Очередь фоновых задач в таблице ``core.Job``.
+
+Задача — функция, зарегистрированная ``@task('имя')`` в модуле
+``tasks`` приложения; ``enqueue`` записывает ее вызов строкой в базу в
+той же транзакции, что и данные запроса, поэтому откат запроса
+отменяет и задачу. Воркер (``manage.py run_jobs``) забирает готовые
+задачи пачками: строки помечаются его именем одним UPDATE, поэтому
+несколько воркеров не выполнят одну задачу дважды, а задачи упавшего
+воркера возвращаются в очередь через ``JOBS_LEASE_SECONDS``. Ошибка
+откладывает повтор с экспоненциальной паузой, после ``max_attempts``
+попыток задача остается в статусе ``failed`` с текстом ошибки.
+Задачи с ``batch=True`` получают список аргументов всех задач пачки
+одним вызовом. Ключ ``key`` делает постановку идемпотентной: вторая
+задача с тем же ключом не создается, пока первая не удалена
+``purge``. При ``JOBS_EAGER`` задачи выполняются сразу, в процессе, —
+для тестов и разработки без воркера; строка Job тогда не пишется, и
+запрос тратит только запросы самой задачи.
+"""
+import json
+import logging
+import time
+import traceback
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger('core.jobs')
+
+REGISTRY = {}
+
+
+class Task:
+    def __init__(self, name, function, batch, max_attempts):
+        self.name = name
+        self.function = function
+        self.batch = batch
+        self.max_attempts = max_attempts
+
+    def run(self, payloads):
+        if self.batch:
+            self.function(payloads)
+        else:
+            for payload in payloads:
+                self.function(payload)
+
+
+def task(name, batch=False, max_attempts=3):
+    """Регистрирует функцию как задачу ``name``."""
+
+    def register(function):
+        REGISTRY[name] = Task(name, function, batch, max_attempts)
+        return function
+    return register
+
+
+def autodiscover():
+    autodiscover_modules('tasks')
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    """Ставит задачу в очередь; вернет False, если ключ уже занят."""
+
+    registered = REGISTRY[name]
+    if settings.JOBS_EAGER:
+        registered.run([payload])
+        return True
+    fields = {
+        'name': name,
+        'payload': json.dumps(payload, cls=DjangoJSONEncoder),
+        'max_attempts': registered.max_attempts,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+    }
+    if key is None:
+        Job.objects.create(**fields)
+        return True
+    _, created = Job.objects.get_or_create(key=key, defaults=fields)
+    return created
+
+
+def claim(worker, limit):
+    """Забирает до ``limit`` готовых задач для воркера ``worker``."""
+
+    now = timezone.now()
+    ready = Q(status=Job.QUEUED, run_at__lte=now) | Q(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    )
+    with transaction.atomic():
+        ids = list(
+            Job.objects.filter(ready).order_by('run_at', 'pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # Условие повторяется: задачу мог забрать другой воркер.
+        Job.objects.filter(ready, pk__in=ids).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now,
+            attempts=F('attempts') + 1
+        )
+    return list(
+        Job.objects.filter(pk__in=ids, locked_by=worker, locked_at=now)
+        .order_by('run_at', 'pk')
+    )
+
+
+def _retry_delay(attempts):
+    return settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def _finish(jobs, error=None):
+    now = timezone.now()
+    if error is None:
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.DONE, finished=now, last_error=''
+        )
+        return
+    for job in jobs:
+        if job.attempts >= job.max_attempts:
+            changes = {'status': Job.FAILED, 'finished': now}
+        else:
+            changes = {
+                'status': Job.QUEUED,
+                'run_at': now + timedelta(
+                    seconds=_retry_delay(job.attempts)
+                ),
+            }
+        Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+            last_error=error, **changes
+        )
+
+
+def execute(jobs):
+    """Выполняет забранные задачи; вернет (выполнено, с ошибкой)."""
+
+    groups = defaultdict(list)
+    for job in jobs:
+        groups[job.name].append(job)
+    done = failed = 0
+    for name, group in groups.items():
+        registered = REGISTRY.get(name)
+        if registered is None:
+            for job in group:
+                job.attempts = job.max_attempts
+            _finish(group, f'Неизвестная задача {name}')
+            failed += len(group)
+            continue
+        calls = [group] if registered.batch else [[job] for job in group]
+        for call in calls:
+            try:
+                with transaction.atomic():
+                    registered.run([json.loads(job.payload) for job in call])
+            except Exception:
+                logger.exception('Задача %s не выполнена', name)
+                _finish(call, traceback.format_exc())
+                failed += len(call)
+            else:
+                _finish(call)
+                done += len(call)
+    return done, failed
+
+
+def work(worker, batch_size=None, idle=1.0, once=False):
+    """Цикл воркера: забирает и выполняет пачки до остановки.
+
+    С ``once`` выходит, как только очередь пуста; вернет
+    (выполнено, с ошибкой).
+    """
+
+    batch_size = batch_size or settings.JOBS_BATCH_SIZE
+    totals = [0, 0]
+    while True:
+        close_old_connections()
+        jobs = claim(worker, batch_size)
+        if not jobs:
+            if once:
+                return tuple(totals)
+            time.sleep(idle)
+            continue
+        done, failed = execute(jobs)
+        totals[0] += done
+        totals[1] += failed
+
+
+def purge(days):
+    """Удаляет выполненные и упавшие задачи старше ``days`` дней."""
+
+    deleted, _ = Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED),
+        finished__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
@@ -0,0 +1,53 @@
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from core.db import concurrency
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает одновременные чтение и запись в SQLite со '
+        'стандартным бэкендом и с core.db.sqlite3.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=3.0,
+            help='Длительность прогона каждого профиля, секунды.'
+        )
+        parser.add_argument(
+            '--rows', type=int, default=20_000,
+            help='Постов в базе перед прогоном.'
+        )
+        parser.add_argument(
+            '--profile', action='append', choices=concurrency.PROFILES,
+            help='Профиль для прогона; по умолчанию все.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'profile':<10}{'journal':>9}{'op':>7}{'per sec':>10}"
+            f"{'p95, ms':>10}{'errors':>8}"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in options['profile'] or concurrency.PROFILES:
+                alias = concurrency.prepare(
+                    profile, directory, options['rows']
+                )
+                try:
+                    journal = concurrency.journal(alias)
+                    summary = concurrency.run(
+                        alias, options['readers'], options['writers'],
+                        options['duration']
+                    )
+                finally:
+                    concurrency.release(alias)
+                for kind, row in summary.items():
+                    self.stdout.write(
+                        f'{profile:<10}{journal:>9}{kind:>7}'
+                        f"{row['per_second']:>10}{str(row['p95_ms']):>10}"
+                        f"{row['errors']:>8}"
+                    )
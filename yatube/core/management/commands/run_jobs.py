@@ -0,0 +1,47 @@
+import os
+import socket
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Воркер очереди core.jobs: забирает готовые задачи пачками и '
+        'выполняет их. Воркеров можно запустить несколько.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Задач за один заход; по умолчанию JOBS_BATCH_SIZE.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза при пустой очереди, секунды.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.'
+        )
+        parser.add_argument(
+            '--purge-days', type=int,
+            help='Сначала удалить завершенные задачи старше стольких дней.'
+        )
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            purged = jobs.purge(options['purge_days'])
+            self.stdout.write(f'Удалено завершенных задач: {purged}')
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        try:
+            done, failed = jobs.work(
+                worker, options['batch_size'], options['sleep'],
+                options['once']
+            )
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(
+            f'Выполнено задач: {done}, с ошибкой: {failed}'
+        )
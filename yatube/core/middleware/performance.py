@@ -0,0 +1,172 @@
+"""Замеры запроса: SQL, шаблоны и кэш.
+
+Для каждого запроса считаются число и время SQL-запросов, время
+рендеринга шаблонов и попадания/промахи кэша. Выбранные с вероятностью
+``PERFORMANCE_SAMPLE_RATE`` запросы получают заголовок ``Server-Timing``
+и строку в журнале ``core.performance``; запросы дольше
+``PERFORMANCE_SLOW_REQUEST_MS`` журналируются всегда, вместе со списком
+выполненных SQL.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import Template
+
+logger = logging.getLogger('core.performance')
+
+_current = ContextVar('performance_metrics', default=None)
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        return ', '.join((
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{len(self.queries)} queries"',
+            f'tpl;dur={self.render_time * 1000:.1f}',
+            f'cache;desc="hits={self.cache_hits} '
+            f'misses={self.cache_misses}"',
+            f'total;dur={total * 1000:.1f}',
+        ))
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            duration = time.perf_counter() - started
+            metrics.db_time += duration
+            metrics.queries.append((sql, duration))
+
+
+# Backend-шаблон рендерится один раз на render(), вложенные include
+# идут мимо него, поэтому время не считается дважды.
+_render = None
+
+
+def _timed_render(self, context=None, request=None):
+    metrics = _current.get()
+    if metrics is None:
+        return _render(self, context, request)
+    started = time.perf_counter()
+    try:
+        return _render(self, context, request)
+    finally:
+        metrics.render_time += time.perf_counter() - started
+
+
+def _install_render_timer():
+    """Оборачивает Template.render один раз, при создании middleware."""
+
+    global _render
+    if _render is None:
+        _render = Template.render
+        Template.render = _timed_render
+
+
+@contextmanager
+def _counting_cache(backend, metrics):
+    """Подменяет get/get_many объекта кэша текущего потока."""
+
+    cls = type(backend)
+    inside_many = []
+
+    def get(key, default=None, version=None):
+        value = cls.get(backend, key, default, version)
+        if not inside_many:
+            if value is default:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return value
+
+    def get_many(keys, version=None):
+        keys = list(keys)
+        inside_many.append(True)
+        try:
+            values = cls.get_many(backend, keys, version)
+        finally:
+            inside_many.pop()
+        metrics.cache_hits += len(values)
+        metrics.cache_misses += len(keys) - len(values)
+        return values
+
+    backend.get = get
+    backend.get_many = get_many
+    try:
+        yield
+    finally:
+        del backend.get
+        del backend.get_many
+
+
+class PerformanceMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _install_render_timer()
+
+    def __call__(self, request):
+        metrics = Metrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(_record_query)
+                    )
+                for alias in settings.CACHES:
+                    stack.enter_context(
+                        _counting_cache(caches[alias], metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = metrics.total_time
+        slow = total * 1000 >= settings.PERFORMANCE_SLOW_REQUEST_MS
+        if slow or random.random() < settings.PERFORMANCE_SAMPLE_RATE:
+            response['Server-Timing'] = metrics.server_timing(total)
+            self.log(request, response, metrics, total, slow)
+        return response
+
+    def log(self, request, response, metrics, total, slow):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'queries': len(metrics.queries),
+            'render_ms': round(metrics.render_time * 1000, 1),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        }
+        if slow:
+            record['slow'] = True
+            record['sql'] = [
+                {'sql': sql, 'ms': round(duration * 1000, 2)}
+                for sql, duration in metrics.queries
+            ]
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(record, ensure_ascii=False))
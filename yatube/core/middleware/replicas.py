@@ -0,0 +1,21 @@
+from django.conf import settings
+
+from core.db.routers import PRIMARY_PIN_COOKIE, tracking_writes
+
+
+class PrimaryPinMiddleware:
+    """Ставит cookie привязки к основной базе клиенту, который писал."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with tracking_writes() as state:
+            response = self.get_response(request)
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                samesite='Lax'
+            )
+        return response
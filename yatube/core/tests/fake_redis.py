@@ -0,0 +1,162 @@
+"""Минимальный RESP-сервер в памяти процесса для тестов RedisCache."""
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeRedisHandler)
+        self.data = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+        self.connections = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f'redis://{host}:{port}/0'
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        while True:
+            try:
+                command = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            if command is None:
+                return
+            name = command[0].decode().upper()
+            with self.server.lock:
+                reply = getattr(self, f'cmd_{name.lower()}', self.unknown)(
+                    *command[1:]
+                )
+            self.wfile.write(reply)
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    @staticmethod
+    def bulk(value):
+        if value is None:
+            return b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    @staticmethod
+    def integer(value):
+        return b':%d\r\n' % value
+
+    def array(self, values):
+        return b'*%d\r\n' % len(values) + b''.join(values)
+
+    def unknown(self, *args):
+        return b'-ERR unknown command\r\n'
+
+    def cmd_ping(self):
+        return b'+PONG\r\n'
+
+    def cmd_get(self, key):
+        server = self.server
+        return self.bulk(server.data[key] if server.alive(key) else None)
+
+    def cmd_mget(self, *keys):
+        return self.array([self.cmd_get(key) for key in keys])
+
+    def cmd_set(self, key, value, *options):
+        server = self.server
+        options = [option.upper() for option in options]
+        if b'NX' in options and server.alive(key):
+            return self.bulk(None)
+        server.data[key] = value
+        server.expires.pop(key, None)
+        if b'PX' in options:
+            milliseconds = int(options[options.index(b'PX') + 1])
+            server.expires[key] = time.monotonic() + milliseconds / 1000
+        return b'+OK\r\n'
+
+    def cmd_del(self, *keys):
+        server = self.server
+        deleted = 0
+        for key in keys:
+            if server.alive(key):
+                del server.data[key]
+                server.expires.pop(key, None)
+                deleted += 1
+        return self.integer(deleted)
+
+    def cmd_exists(self, *keys):
+        return self.integer(sum(self.server.alive(key) for key in keys))
+
+    def cmd_incrby(self, key, delta):
+        server = self.server
+        current = server.data[key] if server.alive(key) else b'0'
+        try:
+            value = int(current) + int(delta)
+        except ValueError:
+            return b'-ERR value is not an integer or out of range\r\n'
+        server.data[key] = str(value).encode()
+        return self.integer(value)
+
+    def cmd_pexpire(self, key, milliseconds):
+        server = self.server
+        if not server.alive(key):
+            return self.integer(0)
+        server.expires[key] = time.monotonic() + int(milliseconds) / 1000
+        return self.integer(1)
+
+    def cmd_persist(self, key):
+        server = self.server
+        if not server.alive(key) or key not in server.expires:
+            return self.integer(0)
+        del server.expires[key]
+        return self.integer(1)
+
+    def cmd_flushdb(self, *args):
+        self.server.data.clear()
+        self.server.expires.clear()
+        return b'+OK\r\n'
+
+    def cmd_scan(self, cursor, *options):
+        options = [option.upper() if index % 2 == 0 else option
+                   for index, option in enumerate(options)]
+        pattern = '*'
+        if b'MATCH' in options:
+            pattern = options[options.index(b'MATCH') + 1].decode()
+        keys = [
+            self.bulk(key) for key in list(self.server.data)
+            if self.server.alive(key) and fnmatch.fnmatchcase(
+                key.decode(), pattern
+            )
+        ]
+        return self.array([self.bulk(b'0'), self.array(keys)])
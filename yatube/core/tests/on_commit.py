@@ -0,0 +1,21 @@
+"""Колбэки ``transaction.on_commit`` внутри ``TestCase``.
+
+TestCase держит каждый тест в транзакции, которая откатывается, и
+колбэки после фиксации в нем не вызываются. ``run_on_commit`` вызывает
+колбэки, зарегистрированные внутри блока, как будто транзакция
+зафиксирована (аналог ``captureOnCommitCallbacks`` из Django 3.2).
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@contextmanager
+def run_on_commit(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
@@ -0,0 +1,122 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..cache.backends import RedisCache
+from ..cache.serializers import COMPRESSED, CompactSerializer
+from .fake_redis import FakeRedisServer
+from .on_commit import run_on_commit
+
+User = get_user_model()
+
+
+class TestRedisCache(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeRedisServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache = RedisCache(self.server.url, {
+            'KEY_PREFIX': 'test',
+            'OPTIONS': {'COMPRESS_THRESHOLD': 64},
+        })
+        self.cache.clear()
+
+    def test_basic_operations(self):
+        """ Тестирование основных операций кэша """
+
+        self.cache.set('text', 'значение')
+        self.cache.set_many({'a': [1, 2], 'b': {'c': True}})
+        self.assertEqual(self.cache.get('text'), 'значение')
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'missing']),
+            {'a': [1, 2], 'b': {'c': True}}
+        )
+        self.assertFalse(self.cache.add('text', 'other'))
+        self.cache.delete('text')
+        self.assertIsNone(self.cache.get('text'))
+        self.cache.set('gone', 1, 0)
+        self.assertFalse(self.cache.has_key('gone'))
+
+    def test_incr_is_server_side(self):
+        """ Тестирование атомарного incr """
+
+        with self.assertRaises(ValueError):
+            self.cache.incr('counter')
+        self.cache.set('counter', 10)
+        self.assertEqual(self.cache.incr('counter', 5), 15)
+        self.assertEqual(self.cache.get('counter'), 15)
+
+    def test_compression(self):
+        """ Тестирование сжатия больших значений """
+
+        value = 'x' * 1000
+        self.cache.set('big', value)
+        raw = self.cache.client.get(self.cache.make_key('big'))
+        self.assertTrue(raw.startswith(COMPRESSED))
+        self.assertLess(len(raw), 100)
+        self.assertEqual(self.cache.get('big'), value)
+
+    def test_pool_is_shared(self):
+        """ Тестирование общего пула соединений """
+
+        other = RedisCache(self.server.url, {
+            'KEY_PREFIX': 'test',
+            'OPTIONS': {'COMPRESS_THRESHOLD': 64},
+        })
+        self.assertIs(
+            other.client.connection_pool, self.cache.client.connection_pool
+        )
+
+    def test_serializer_rejects_objects(self):
+        """ Тестирование отказа от pickle """
+
+        with self.assertRaises(TypeError):
+            CompactSerializer().dumps(object())
+
+
+class TestFeedOnSharedCache(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeRedisServer().start()
+        cls.settings_override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'core.cache.backends.RedisCache',
+                'LOCATION': cls.server.url,
+            }
+        })
+        cls.settings_override.enable()
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        cls.server.stop()
+
+    def test_index_fragment(self):
+        """ Тестирование кэша ленты на общем сервере """
+
+        cache.clear()
+        self.client.get(reverse('posts:index'))
+        self.assertTrue(self.server.data)
+        with run_on_commit():
+            Post.objects.create(text='fresh post', author=self.author)
+        self.assertContains(self.client.get(reverse('posts:index')),
+                            'fresh post')
+
+
+if __name__ == '__main__':
+    unittest.main()
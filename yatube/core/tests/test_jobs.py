@@ -0,0 +1,172 @@
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Follow, Post, TimelineEntry, User
+
+from .. import jobs
+from ..models import Job
+
+CALLS = []
+
+
+@jobs.task('tests.record')
+def record(payload):
+    CALLS.append(payload)
+
+
+@jobs.task('tests.batch', batch=True)
+def record_batch(payloads):
+    CALLS.append(payloads)
+
+
+@jobs.task('tests.broken', max_attempts=2)
+def broken(payload):
+    raise ValueError('сломано')
+
+
+@override_settings(JOBS_EAGER=False, JOBS_RETRY_DELAY=0)
+class TestJobs(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def work(self, batch_size=None):
+        return jobs.work('test-worker', batch_size, once=True)
+
+    def test_eager(self):
+        """ Тестирование немедленного выполнения в режиме JOBS_EAGER """
+
+        with self.settings(JOBS_EAGER=True), self.assertNumQueries(0):
+            self.assertTrue(jobs.enqueue('tests.record', {'a': 1}, key='a'))
+        self.assertEqual(CALLS, [{'a': 1}])
+        self.assertFalse(Job.objects.exists())
+
+    def test_idempotency_key(self):
+        """ Тестирование повторной постановки задачи с тем же ключом """
+
+        self.assertTrue(jobs.enqueue('tests.record', 1, key='one'))
+        self.assertFalse(jobs.enqueue('tests.record', 1, key='one'))
+        self.assertEqual(self.work(), (1, 0))
+        self.assertFalse(jobs.enqueue('tests.record', 1, key='one'))
+        self.assertEqual(self.work(), (0, 0))
+        self.assertEqual(CALLS, [1])
+
+    def test_batch(self):
+        """ Тестирование выполнения пачки одним вызовом """
+
+        for number in range(5):
+            jobs.enqueue('tests.batch', number)
+        jobs.enqueue('tests.record', 'single')
+        self.assertEqual(self.work(batch_size=3), (6, 0))
+        self.assertEqual(CALLS, [[0, 1, 2], [3, 4], 'single'])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 6)
+
+    def test_retries_then_fails(self):
+        """ Тестирование повторов и статуса failed после max_attempts """
+
+        jobs.enqueue('tests.broken')
+        self.assertEqual(self.work(), (0, 2))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn('сломано', job.last_error)
+
+    def test_delay(self):
+        """ Тестирование отложенной задачи """
+
+        jobs.enqueue('tests.record', 1, delay=60)
+        self.assertEqual(self.work(), (0, 0))
+        Job.objects.update(run_at=timezone.now())
+        self.assertEqual(self.work(), (1, 0))
+
+    def test_stale_lease_is_reclaimed(self):
+        """ Тестирование возврата задач упавшего воркера """
+
+        jobs.enqueue('tests.record', 1)
+        self.assertEqual(len(jobs.claim('dead-worker', 10)), 1)
+        self.assertEqual(jobs.claim('test-worker', 10), [])
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.work(), (1, 0))
+        self.assertEqual(Job.objects.get().attempts, 2)
+
+    def test_rollback_drops_job(self):
+        """ Тестирование отмены задачи вместе с транзакцией запроса """
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            jobs.enqueue('tests.record', 1)
+            raise RuntimeError
+        self.assertFalse(Job.objects.exists())
+
+    def test_purge(self):
+        """ Тестирование удаления старых завершенных задач """
+
+        jobs.enqueue('tests.record', 1, key='old')
+        self.work()
+        Job.objects.update(finished=timezone.now() - timedelta(days=8))
+        call_command('run_jobs', once=True, purge_days=7, stdout=StringIO())
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(JOBS_EAGER=False)
+class TestPostJobs(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='Writer', email='writer@example.com'
+        )
+        cls.reader = User.objects.create_user(username='Reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_fan_out_in_worker(self):
+        """ Тестирование раскладки поста по лентам воркером """
+
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        out = StringIO()
+        call_command('run_jobs', once=True, stdout=out)
+        self.assertIn('Выполнено задач: 1', out.getvalue())
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+
+    @override_settings(SITE_URL='https://yatube.example')
+    def test_comment_email(self):
+        """ Тестирование письма автору поста о комментарии """
+
+        post = Post.objects.create(text='Пост', author=self.author)
+        client = Client()
+        client.force_login(self.reader)
+        client.post(
+            reverse('posts:add_comment', args=(post.pk,)),
+            {'text': 'Комментарий'}
+        )
+        self.assertEqual(mail.outbox, [])
+        comment = post.comments.get()
+        self.assertFalse(jobs.enqueue(
+            'posts.comment_email', comment.pk,
+            key=f'comment-email:{comment.pk}'
+        ))
+        self.assertEqual(
+            Job.objects.filter(name='posts.comment_email').count(), 1
+        )
+        call_command('run_jobs', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['writer@example.com'])
+        self.assertIn('Комментарий', mail.outbox[0].body)
+        self.assertIn(
+            'https://yatube.example'
+            + reverse('posts:post_detail', args=(post.pk,)),
+            mail.outbox[0].body
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
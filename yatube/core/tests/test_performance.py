@@ -0,0 +1,91 @@
+import json
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class TestPerformanceMiddleware(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test',
+            description='test desc'
+        )
+        Post.objects.create(
+            text='test text', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def metrics(self, logs):
+        return json.loads(logs.records[-1].getMessage())
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=1)
+    def test_sampled_request(self):
+        """ Тестирование Server-Timing и строки журнала """
+
+        url = reverse('posts:group_list', kwargs={'slug': 'test'})
+        with self.assertLogs('core.performance', 'INFO') as logs:
+            response = self.client.get(url)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        record = self.metrics(logs)
+        self.assertEqual(record['path'], url)
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['render_ms'], 0)
+        self.assertGreater(record['cache_misses'], 0)
+        self.assertNotIn('sql', record)
+        with self.assertLogs('core.performance', 'INFO') as logs:
+            self.client.get(url)
+        self.assertGreater(self.metrics(logs)['cache_hits'], 0)
+
+    @override_settings(
+        PERFORMANCE_SAMPLE_RATE=0, PERFORMANCE_SLOW_REQUEST_MS=0
+    )
+    def test_slow_request_dumps_queries(self):
+        """ Тестирование журнала медленного запроса со списком SQL """
+
+        with self.assertLogs('core.performance', 'WARNING') as logs:
+            self.client.get(reverse('posts:index'))
+        record = self.metrics(logs)
+        self.assertTrue(record['slow'])
+        self.assertEqual(len(record['sql']), record['queries'])
+        self.assertIn('posts_post', ' '.join(q['sql'] for q in record['sql']))
+
+    def test_render_timer_installed_once(self):
+        """ Тестирование однократной обертки Template.render """
+
+        from django.template.backends.django import Template
+
+        from ..middleware import performance
+        performance._install_render_timer()
+        original = performance._render
+        performance._install_render_timer()
+        self.assertIs(Template.render, performance._timed_render)
+        self.assertIs(performance._render, original)
+        self.assertIsNot(original, performance._timed_render)
+
+    @override_settings(
+        PERFORMANCE_SAMPLE_RATE=0, PERFORMANCE_SLOW_REQUEST_MS=10 ** 6
+    )
+    def test_not_sampled(self):
+        """ Тестирование запроса вне выборки """
+
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.db import concurrency
+from core.db.routers import PRIMARY_PIN_COOKIE, ReplicaRouter
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class TestReplicaRouting(TransactionTestCase):
+    """Основная база и реплика — два отдельных файла SQLite."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Writer')
+        self.client.force_login(self.author)
+        Post.objects.create(text='replicated post', author=self.author)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'replica.sqlite3')
+        self.sync_replica()
+        connections.databases['replica'] = {
+            **connections['default'].settings_dict, 'NAME': self.path,
+        }
+        connections.ensure_defaults('replica')
+        self.addCleanup(concurrency.release, 'replica')
+        Post.objects.create(text='primary only post', author=self.author)
+
+    def sync_replica(self):
+        """Догоняет реплику до текущего состояния основной базы."""
+
+        primary = connections['default']
+        primary.ensure_connection()
+        replica = sqlite3.connect(self.path)
+        primary.connection.backup(replica)
+        replica.close()
+
+    def test_reads_go_to_replica(self):
+        """ Тестирование чтения ленты с отстающей реплики """
+
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, 'replicated post')
+        self.assertNotContains(response, 'primary only post')
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_replica_fragment_not_pinned(self):
+        """ Тестирование срока жизни фрагмента, собранного по реплике """
+
+        reader = Client()
+        self.assertNotContains(
+            reader.get(reverse('posts:index')), 'primary only post'
+        )
+        self.sync_replica()
+        self.assertContains(
+            reader.get(reverse('posts:index')), 'primary only post'
+        )
+
+    def test_writer_reads_primary(self):
+        """ Тестирование чтения с основной базы после своей записи """
+
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'my new post'}
+        )
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'my new post')
+        self.assertContains(response, 'primary only post')
+
+    def test_router(self):
+        """ Тестирование маршрутизатора вне запроса """
+
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import SimpleTestCase
+
+from core.db import concurrency
+
+
+class TestTunedSQLite(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'test.sqlite3')
+
+    def connect(self, **options):
+        connections.databases['tuned'] = {
+            'ENGINE': 'core.db.sqlite3', 'NAME': self.path,
+            'OPTIONS': options,
+        }
+        connections.ensure_defaults('tuned')
+        self.addCleanup(concurrency.release, 'tuned')
+        return connections['tuned']
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        """ Тестирование PRAGMA нового соединения """
+
+        connection = self.connect(pragmas={'cache_size': -1000})
+        expected = {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'cache_size': -1000,
+            'mmap_size': 256 * 1024 * 1024,
+        }
+        for name, value in expected.items():
+            with self.subTest(value=name):
+                self.assertEqual(self.pragma(connection, name), value)
+
+    def test_transaction_mode(self):
+        """ Тестирование BEGIN IMMEDIATE в atomic """
+
+        connection = self.connect(transaction_mode='immediate')
+        executed = []
+
+        def record(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            with transaction.atomic(using='tuned'):
+                pass
+        self.assertEqual(executed[0], 'BEGIN IMMEDIATE')
+
+    def test_wrong_transaction_mode(self):
+        """ Тестирование неизвестного режима транзакций """
+
+        self.connect(transaction_mode='eventually')
+        with self.assertRaises(ImproperlyConfigured):
+            with transaction.atomic(using='tuned'):
+                pass
+
+    def test_bench_command(self):
+        """ Тестирование отчета команды bench_sqlite """
+
+        out = StringIO()
+        call_command('bench_sqlite', '--duration', '0.2', '--rows', '100',
+                     '--readers', '2', '--writers', '1', stdout=out)
+        report = out.getvalue()
+        self.assertIn('wal', report)
+        self.assertIn('delete', report)
+        self.assertEqual(set(concurrency.PROFILES) - set(report.split()),
+                         set())
+
+
+if __name__ == '__main__':
+    unittest.main()
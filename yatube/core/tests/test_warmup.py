@@ -0,0 +1,73 @@
+import unittest
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from core.warmup import django_engines, measure, template_names, warm
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+
+class TestWarmup(TestCase):
+    def test_template_names(self):
+        """ Тестирование поиска шаблонов проекта и приложений """
+
+        names = template_names(django_engines()[0])
+        for name in ('base.html', 'posts/includes/paginator.html',
+                     'posts/includes/switcher.html', 'admin/base.html'):
+            with self.subTest(value=name):
+                self.assertIn(name, names)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_fills_cached_loader(self):
+        """ Тестирование предзагрузки шаблонов в кэширующий загрузчик """
+
+        loaded, errors = warm()
+        self.assertEqual(errors, {})
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(len(loader.get_template_cache), loaded)
+        self.assertIn('base.html', loader.get_template_cache)
+
+    def test_measure(self):
+        """ Тестирование замера разбора и рендеринга шаблона """
+
+        engine = django_engines()[0]
+        compile_time, render_time, error = measure(
+            engine, 'includes/footer.html', {}, repeat=2
+        )
+        self.assertGreater(compile_time, 0)
+        self.assertGreater(render_time, 0)
+        self.assertIsNone(error)
+        _, render_time, error = measure(
+            engine, 'includes/footer.html', repeat=2, render=False
+        )
+        self.assertIsNone(render_time)
+
+    def test_build_templates_command(self):
+        """ Тестирование отчета команды build_templates """
+
+        out = StringIO()
+        call_command('build_templates', '--prefix', 'posts/',
+                     '--repeat', '1', stdout=out)
+        report = out.getvalue()
+        self.assertIn('posts/index.html', report)
+        self.assertNotIn('admin/', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Предзагрузка и замеры шаблонов.
+
+С кэширующим загрузчиком (``django.template.loaders.cached.Loader``)
+шаблон разбирается один раз на процесс. ``warm`` делает это при
+старте, чтобы первые запросы после деплоя не платили за разбор
+``base.html`` и общих include. ``measure`` считает стоимость разбора и
+рендеринга одного шаблона для отчета ``build_templates``.
+"""
+import logging
+import os
+import time
+
+from django.template import Context, RequestContext, Template, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger('core.warmup')
+
+EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def django_engines():
+    return [backend.engine for backend in engines.all()
+            if isinstance(backend, DjangoTemplates)]
+
+
+def _source_loaders(engine):
+    for loader in engine.template_loaders:
+        if isinstance(loader, CachedLoader):
+            yield from loader.loaders
+        else:
+            yield loader
+
+
+def template_names(engine):
+    """Имена всех шаблонов из каталогов загрузчиков движка."""
+
+    names = set()
+    for loader in _source_loaders(engine):
+        for directory in loader.get_dirs():
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith(EXTENSIONS):
+                        path = os.path.join(root, filename)
+                        names.add(os.path.relpath(path, directory)
+                                  .replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm():
+    """Загружает все шаблоны в кэш загрузчика; вернет (число, ошибки)."""
+
+    loaded = 0
+    errors = {}
+    for engine in django_engines():
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except Exception as error:
+                errors[name] = error
+            else:
+                loaded += 1
+    for name, error in errors.items():
+        logger.warning('Шаблон %s не разобран: %s', name, error)
+    return loaded, errors
+
+
+def measure(engine, name, context=None, request=None, repeat=5,
+            render=True):
+    """Лучшее из ``repeat`` время разбора и рендеринга шаблона, в секундах.
+
+    Вернет (разбор, рендеринг, ошибка рендеринга); если шаблон не
+    рендерится с переданным контекстом или ``render`` ложно, время
+    рендеринга — None.
+    """
+
+    template, origin = engine.find_template(name)
+    source = origin.loader.get_contents(origin)
+    compile_time = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        template = Template(source, origin, name, engine)
+        compile_time = min(compile_time, time.perf_counter() - started)
+    if not render:
+        return compile_time, None, None
+    render_time = float('inf')
+    for _ in range(repeat):
+        if request is None:
+            render_context = Context(context)
+        else:
+            render_context = RequestContext(request, context)
+        started = time.perf_counter()
+        try:
+            template.render(render_context)
+        except Exception as error:
+            return compile_time, None, error
+        render_time = min(render_time, time.perf_counter() - started)
+    return compile_time, render_time, None
@@ -1,5 +1,25 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
+
+
+def drop_search_content(sender, using, **kwargs):
+    from django.db import connections
+
+    from .search import drop_content
+    drop_content(connections[using])
+
+
+def sync_search_index(sender, using, **kwargs):
+    from django.db import connections
+
+    from .search import ensure_index
+    ensure_index(connections[using])
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        pre_migrate.connect(drop_search_content, sender=self)
+        post_migrate.connect(sync_search_index, sender=self)
@@ -0,0 +1,87 @@
+"""Перенос старых постов и их комментариев в архивные таблицы.
+
+Пост старше ``ARCHIVE_AFTER_DAYS`` вместе с комментариями копируется в
+``ArchivedPost``/``ArchivedComment`` с теми же id и удаляется из горячих
+таблиц. Записи лент подписок остаются — они ссылаются на id, а не на
+таблицу, — а строки переиндексируются для поиска по архиву. Ленты,
+собранные через ``PostQuerySet.with_archive``, и лента подписок
+продолжаются в архиве, поэтому ссылки и курсоры остаются рабочими.
+Каждая пачка переносится в своей транзакции прямыми INSERT … SELECT и
+DELETE: сигналы не срабатывают, поэтому
+счетчики профилей и групп, которые учитывают архив, не меняются, а
+файлы картинок остаются на месте. Прогресс — сами таблицы: прерванный
+перенос продолжается с первого еще не перенесенного поста.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import caching, search
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+# Не больше 999 параметров в одном запросе SQLite.
+BATCH_SIZE = 500
+POST_COLUMNS = (
+    'id', 'text', 'pub_date', 'author_id', 'group_id', 'image',
+    'thumbnail', 'image_variants', 'comments_count',
+)
+COMMENT_COLUMNS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def cutoff(days=None):
+    """Граница архива: посты опубликованы раньше нее."""
+
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def _copy(cursor, source, target, columns, key, ids):
+    quote = connection.ops.quote_name
+    names = ', '.join(map(quote, columns))
+    cursor.execute(
+        f'INSERT INTO {quote(target._meta.db_table)} ({names}) '
+        f'SELECT {names} FROM {quote(source._meta.db_table)} '
+        f"WHERE {quote(key)} IN ({', '.join(['%s'] * len(ids))})",
+        ids
+    )
+    return cursor.rowcount
+
+
+def _delete(cursor, model, key, ids):
+    quote = connection.ops.quote_name
+    cursor.execute(
+        f'DELETE FROM {quote(model._meta.db_table)} '
+        f"WHERE {quote(key)} IN ({', '.join(['%s'] * len(ids))})",
+        ids
+    )
+
+
+def archive_batch(before, batch_size=BATCH_SIZE):
+    """Переносит до ``batch_size`` самых старых постов раньше ``before``.
+
+    Вернет (постов, комментариев); ноль постов — переносить нечего.
+    """
+
+    batch_size = min(batch_size, BATCH_SIZE)
+    with transaction.atomic():
+        ids = list(
+            Post.objects.filter(pub_date__lt=before)
+            .order_by('pub_date', 'pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0, 0
+        with connection.cursor() as cursor:
+            posts = _copy(cursor, Post, ArchivedPost, POST_COLUMNS, 'id', ids)
+            comments = _copy(
+                cursor, Comment, ArchivedComment, COMMENT_COLUMNS, 'post_id',
+                ids
+            )
+            _delete(cursor, Comment, 'post_id', ids)
+            _delete(cursor, Post, 'id', ids)
+            search.index_archived(cursor, ids)
+    caching.bump(*(f'post:{pk}' for pk in ids))
+    return posts, comments
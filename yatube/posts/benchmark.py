@@ -0,0 +1,186 @@
+"""Прогон смеси запросов к представлениям posts внутри процесса.
+
+Запросы идут через ``django.test.Client``, то есть через весь стек
+middleware, но без сети и сервера. Для каждого представления
+считаются перцентили задержки и среднее число SQL-запросов, для
+прогона в целом — пропускная способность. ``compare`` сверяет итоги с
+сохраненным эталоном: по умолчанию только число запросов, потому что
+задержки, снятые на другой машине, несравнимы.
+"""
+import random
+import time
+from collections import defaultdict
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Group, Post, User
+
+TRAFFIC_MIX = (
+    ('index', 35),
+    ('group_posts', 15),
+    ('profile', 15),
+    ('post_detail', 20),
+    ('follow_index', 8),
+    ('post_create', 3),
+    ('add_comment', 4),
+)
+PERCENTILES = (50, 95, 99)
+SAMPLE_SIZE = 1000
+
+
+def percentile(values, rank):
+    """Перцентиль методом ближайшего ранга."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, -(-rank * len(ordered) // 100) - 1)
+    return ordered[index]
+
+
+class Harness:
+    def __init__(self, rng_seed=0, clients=20):
+        self.rng = random.Random(rng_seed)
+        users = list(
+            User.objects.filter(posts__isnull=False).distinct()
+            .values_list('username', flat=True)[:SAMPLE_SIZE]
+        )
+        followers = User.objects.filter(follower__isnull=False).distinct()
+        self.usernames = users
+        self.slugs = list(
+            Group.objects.values_list('slug', flat=True)[:SAMPLE_SIZE]
+        )
+        self.post_ids = list(
+            Post.objects.values_list('pk', flat=True)[:SAMPLE_SIZE]
+        )
+        self.group_ids = list(
+            Group.objects.values_list('pk', flat=True)[:SAMPLE_SIZE]
+        )
+        self.anonymous = Client()
+        self.clients = []
+        for user in followers[:clients]:
+            client = Client()
+            client.force_login(user)
+            self.clients.append(client)
+        if not (self.usernames and self.post_ids and self.clients):
+            raise ValueError(
+                'Для прогона нужны посты и подписки: сначала заполните базу.'
+            )
+        self.views, weights = zip(*TRAFFIC_MIX)
+        self.weights = weights
+
+    def _client(self):
+        return self.rng.choice(self.clients)
+
+    def build(self, view):
+        """Возвращает (клиент, метод, адрес, данные) для представления."""
+
+        rng = self.rng
+        if view == 'index':
+            return self.anonymous, 'get', reverse('posts:index'), None
+        if view == 'group_posts':
+            return self.anonymous, 'get', reverse(
+                'posts:group_list', args=(rng.choice(self.slugs),)
+            ), None
+        if view == 'profile':
+            return self.anonymous, 'get', reverse(
+                'posts:profile', args=(rng.choice(self.usernames),)
+            ), None
+        if view == 'post_detail':
+            return self.anonymous, 'get', reverse(
+                'posts:post_detail', args=(rng.choice(self.post_ids),)
+            ), None
+        if view == 'follow_index':
+            return self._client(), 'get', reverse('posts:follow_index'), None
+        if view == 'post_create':
+            data = {'text': f'Нагрузочный пост {rng.random()}'}
+            if self.group_ids:
+                data['group'] = rng.choice(self.group_ids)
+            return self._client(), 'post', reverse('posts:post_create'), data
+        if view == 'add_comment':
+            return self._client(), 'post', reverse(
+                'posts:add_comment', args=(rng.choice(self.post_ids),)
+            ), {'text': 'Нагрузочный комментарий'}
+        raise ValueError(f'Неизвестное представление: {view}')
+
+    def request(self, view):
+        client, method, url, data = self.build(view)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f'{url}: ответ {response.status_code}')
+        return elapsed, len(queries)
+
+    def run(self, requests, warmup=0):
+        """Прогоняет смесь и возвращает сводку по представлениям."""
+
+        for _ in range(warmup):
+            self.request(self.rng.choices(self.views, self.weights)[0])
+        latencies = defaultdict(list)
+        queries = defaultdict(list)
+        started = time.perf_counter()
+        for _ in range(requests):
+            view = self.rng.choices(self.views, self.weights)[0]
+            elapsed, count = self.request(view)
+            latencies[view].append(elapsed * 1000)
+            queries[view].append(count)
+        duration = time.perf_counter() - started
+        views = {}
+        for view in self.views:
+            if not latencies[view]:
+                continue
+            summary = {'count': len(latencies[view])}
+            for rank in PERCENTILES:
+                summary[f'p{rank}'] = round(
+                    percentile(latencies[view], rank), 2
+                )
+            summary['queries'] = round(
+                sum(queries[view]) / len(queries[view]), 2
+            )
+            views[view] = summary
+        return {
+            'requests': requests,
+            'throughput': round(requests / duration, 1) if duration else 0,
+            'views': views,
+        }
+
+
+def compare(results, baseline, tolerance=0.25, timings=False):
+    """Список регрессий относительно эталона; пустой, если их нет.
+
+    Среднее число SQL-запросов сравнивается строго: лишний запрос на
+    каждый вызов представления всегда регрессия, на любой машине. С
+    ``timings`` еще и задержка p95 и пропускная способность — с
+    допуском ``tolerance``; это имеет смысл, только если эталон снят
+    на той же машине.
+    """
+
+    problems = []
+    if timings and (
+        results['throughput'] < baseline['throughput'] * (1 - tolerance)
+    ):
+        problems.append(
+            f"throughput: {results['throughput']} < "
+            f"{baseline['throughput']}"
+        )
+    for view, expected in baseline['views'].items():
+        actual = results['views'].get(view)
+        if actual is None:
+            continue
+        if timings and actual['p95'] > expected['p95'] * (1 + tolerance):
+            problems.append(
+                f"{view} p95: {actual['p95']} мс > {expected['p95']} мс"
+            )
+        if actual['queries'] > expected['queries'] + 0.5:
+            problems.append(
+                f"{view} queries: {actual['queries']} > "
+                f"{expected['queries']}"
+            )
+    return problems
@@ -0,0 +1,145 @@
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.db.routers import read_alias
+
+GLOBAL_SCOPE = 'all'
+
+
+def _generation_key(scope):
+    return f'feed-generation:{scope}'
+
+
+def generation(scope):
+    """Текущее поколение кэша для ленты ``scope``."""
+
+    key = _generation_key(scope)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time_ns(), None)
+        value = cache.get(key)
+    return value
+
+
+def bump(*scopes, using=None):
+    """Инвалидирует ленты, сдвигая их счетчик поколений.
+
+    Поколение сдвигается после фиксации текущей транзакции: иначе
+    читатель мог бы взять новое поколение со старыми данными и
+    закэшировать устаревшую страницу под новым ключом. Вне транзакции
+    сдвиг происходит сразу.
+    """
+
+    transaction.on_commit(partial(_bump, scopes), using=using)
+
+
+def _bump(scopes):
+    """Сдвигает поколения немедленно.
+
+    Если счетчик вытеснен из кэша, он начинается заново со значения
+    времени, поэтому старые ключи не могут совпасть с новыми.
+    """
+
+    for scope in scopes:
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def generations(*scopes):
+    """Поколения нескольких лент за одно обращение к кэшу."""
+
+    keys = [_generation_key(scope) for scope in scopes]
+    values = cache.get_many(keys)
+    result = []
+    for scope, key in zip(scopes, keys):
+        value = values.get(key)
+        result.append(generation(scope) if value is None else value)
+    return result
+
+
+def fragment_version(*scopes):
+    """Версия фрагмента шаблона, зависящего от лент ``scopes``."""
+
+    return ':'.join(map(str, generations(GLOBAL_SCOPE, *scopes)))
+
+
+def post_card_keys(posts):
+    """Ключи карточек постов; поколения берутся одним get_many."""
+
+    common, *versions = generations(
+        GLOBAL_SCOPE, *(f'post:{post.pk}' for post in posts)
+    )
+    alias = read_alias()
+    return [f'post-card:{post.pk}:{common}:{version}:{alias}'
+            for post, version in zip(posts, versions)]
+
+
+def shared_timeout(timeout):
+    """Время жизни записи общего кэша, собранной из текущего чтения.
+
+    Реплика отстает от основной базы не больше ``REPLICA_PIN_SECONDS``,
+    а поколение сдвигается сразу после фиксации на основной. Первый
+    читатель после записи может собрать страницу по реплике, которая
+    записи еще не видит, и положить ее под новым ключом. Поэтому
+    записи, прочитанные с реплики, живут не дольше границы отставания.
+    """
+
+    if read_alias() == 'default':
+        return timeout
+    return min(timeout, settings.REPLICA_PIN_SECONDS)
+
+
+def post_scopes(post, group_id=None, author_id=None):
+    """Области кэша поста; ``group_id``/``author_id`` — прежние значения."""
+
+    scopes = ['index', f'post:{post.pk}']
+    for author in {post.author_id, author_id} - {None}:
+        scopes.append(f'author:{author}')
+    for group in {post.group_id, group_id} - {None}:
+        scopes.append(f'group:{group}')
+    return scopes
+
+
+def feed_cache(request, scope):
+    """Контекст для ``{% cache %}`` фрагмента ленты."""
+
+    cursor = request.GET.get('cursor') or f"page:{request.GET.get('page')}"
+    key = ':'.join((
+        scope,
+        str(generation(GLOBAL_SCOPE)),
+        str(generation(scope)),
+        cursor,
+        read_alias(),
+    ))
+    return {
+        'feed_cache_key': key,
+        'feed_cache_timeout': shared_timeout(settings.FEED_CACHE_TIMEOUT),
+    }
+
+
+def etag(request, *scopes, per_user=True):
+    """Валидатор страницы: поколения лент, пользователь и курсор.
+
+    Не требует запросов к таблицам постов, поэтому 304 отдается до
+    выборки ленты и рендеринга шаблона. Для общих для всех ответов
+    (фидов) ``per_user=False`` убирает пользователя из валидатора;
+    вместо него учитываются схема и хост, от которых зависят
+    абсолютные ссылки фида.
+    """
+
+    parts = [str(value) for value in generations(GLOBAL_SCOPE, *scopes)]
+    if per_user:
+        parts.append(str(request.user.pk or 0))
+    else:
+        parts.append(f'{request.scheme}://{request.get_host()}')
+    parts.append(request.GET.urlencode())
+    parts.append(read_alias())
+    return hashlib.md5(':'.join(parts).encode()).hexdigest()
@@ -0,0 +1,50 @@
+"""ETag-функции для ``django.views.decorators.http.condition``."""
+from .caching import etag
+from .models import ArchivedPost, Group, Post, User
+
+
+def group_etag(request, slug):
+    group = Group.objects.filter(slug=slug).values_list('pk', flat=True)
+    if not group:
+        return None
+    return etag(request, f'group:{group[0]}')
+
+
+def profile_etag(request, username):
+    author = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    )
+    if not author:
+        return None
+    return etag(request, f'author:{author[0]}', f'followers:{author[0]}')
+
+
+def post_etag(request, post_id):
+    author = Post.objects.filter(pk=post_id).values_list(
+        'author', flat=True
+    ) or ArchivedPost.objects.filter(pk=post_id).values_list(
+        'author', flat=True
+    )
+    if not author:
+        return None
+    return etag(request, f'post:{post_id}', f'author:{author[0]}')
+
+
+def index_feed_etag(request, fmt):
+    return etag(request, 'index', per_user=False)
+
+
+def group_feed_etag(request, slug, fmt):
+    group = Group.objects.filter(slug=slug).values_list('pk', flat=True)
+    if not group:
+        return None
+    return etag(request, f'group:{group[0]}', per_user=False)
+
+
+def author_feed_etag(request, username, fmt):
+    author = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    )
+    if not author:
+        return None
+    return etag(request, f'author:{author[0]}', per_user=False)
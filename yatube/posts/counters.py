@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import (ArchivedPost, Comment, Follow, Group, Post, Profile,
+                     User)
+
+
+def _subquery_count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    ), Value(0))
+
+
+def change_profile(user_id, field, delta):
+    """Сдвигает счетчик профиля; при отсутствии профиля пересчитывает."""
+
+    profiles = Profile.objects.filter(user=user_id)
+    if delta < 0:
+        profiles.filter(**{f'{field}__gt': 0}).update(
+            **{field: F(field) + delta}
+        )
+    elif not profiles.update(**{field: F(field) + delta}):
+        recount_profiles(User.objects.filter(pk=user_id))
+
+
+def change_comments(post_id, delta):
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comments_count__gt=0)
+    posts.update(comments_count=F('comments_count') + delta)
+
+
+def change_group(group_id, delta):
+    if group_id is None:
+        return
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(posts_count__gt=0)
+    groups.update(posts_count=F('posts_count') + delta)
+
+
+def _feed_count_key(scope):
+    return f'feed-count:{scope}'
+
+
+def feed_count(scope, queryset, limit=None):
+    """Число постов ленты ``scope`` из кэша.
+
+    При промахе выполняется один COUNT(*) по ``queryset``, дальше
+    значение сдвигается при записи (``change_feed_count``) и раз в
+    ``FEED_COUNT_TIMEOUT`` пересчитывается заново, поэтому может
+    ненадолго расходиться с таблицей. ``limit`` — верхняя граница для
+    обрезаемых лент подписок.
+    """
+
+    key = _feed_count_key(scope)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.FEED_COUNT_TIMEOUT)
+    if limit is not None:
+        count = min(count, limit)
+    return max(count, 0)
+
+
+def change_feed_count(scopes, delta):
+    """Сдвигает закэшированные счетчики; отсутствующие не создаются."""
+
+    for scope in scopes:
+        try:
+            cache.incr(_feed_count_key(scope), delta)
+        except ValueError:
+            pass
+
+
+def reset_feed_count(scopes):
+    cache.delete_many([_feed_count_key(scope) for scope in scopes])
+
+
+def recount_profiles(users=None):
+    """Пересчитывает счетчики профилей по фактическим данным."""
+
+    if users is None:
+        users = User.objects.all()
+    users = users.annotate(
+        posts_total=(
+            _subquery_count(Post.objects, 'author')
+            + _subquery_count(ArchivedPost.objects, 'author')
+        ),
+        followers_total=_subquery_count(Follow.objects, 'author'),
+        following_total=_subquery_count(Follow.objects, 'user'),
+    ).values_list('pk', 'posts_total', 'followers_total', 'following_total')
+    fixed = 0
+    for pk, posts, followers, following in users.iterator():
+        profile, _ = Profile.objects.get_or_create(user_id=pk)
+        totals = (posts, followers, following)
+        if totals != (profile.posts_count, profile.followers_count,
+                      profile.following_count):
+            Profile.objects.filter(pk=profile.pk).update(
+                posts_count=posts,
+                followers_count=followers,
+                following_count=following
+            )
+            fixed += 1
+    return fixed
+
+
+def recount_comments():
+    """Пересчитывает Post.comments_count, возвращает число исправлений."""
+
+    actual = _subquery_count(Comment.objects, 'post')
+    drifted = Post.objects.annotate(actual=actual).exclude(
+        comments_count=F('actual')
+    )
+    fixed = 0
+    for pk, total in drifted.values_list('pk', 'actual').iterator():
+        Post.objects.filter(pk=pk).update(comments_count=total)
+        fixed += 1
+    return fixed
+
+
+def recount_groups():
+    """Пересчитывает Group.posts_count с архивом, вернет число исправлений."""
+
+    actual = (
+        _subquery_count(Post.objects, 'group')
+        + _subquery_count(ArchivedPost.objects, 'group')
+    )
+    drifted = Group.objects.annotate(actual=actual).exclude(
+        posts_count=F('actual')
+    )
+    fixed = 0
+    for pk, total in drifted.values_list('pk', 'actual').iterator():
+        Group.objects.filter(pk=pk).update(posts_count=total)
+        fixed += 1
+    return fixed
+
+
+def get_profile(user):
+    """Профиль со счетчиками; создается, если его еще нет."""
+
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        recount_profiles(User.objects.filter(pk=user.pk))
+        return Profile.objects.get(user=user)
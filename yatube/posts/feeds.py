@@ -0,0 +1,185 @@
+"""RSS, Atom и JSON Feed для общей ленты, групп и авторов.
+
+Документ собирается потоково: заголовок, затем по одному элементу на
+каждый пост из узкой выборки ``.iterator()``, затем хвост. Готовый
+текст попутно складывается в кэш под ключом из поколений ленты, так что
+следующие клиенты получают его без запросов к базе.
+"""
+import json
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .caching import GLOBAL_SCOPE, generations
+from .utils import CursorPaginator
+
+ITEMS_MARKER = '\x00items\x00'
+
+
+class StreamingFeedMixin:
+    """Позволяет отдавать фид Django по частям."""
+
+    latest = None
+
+    def latest_post_date(self):
+        return self.latest or datetime.now(tz=timezone.utc)
+
+    def write_items(self, handler):
+        if self.items is None:
+            handler.ignorableWhitespace(ITEMS_MARKER)
+            return
+        super().write_items(handler)
+
+    def make_item(self, **kwargs):
+        self.items = []
+        self.add_item(**kwargs)
+        return self.items.pop()
+
+    def stream(self, items):
+        buffer = StringIO()
+        self.items = None
+        self.write(buffer, 'utf-8')
+        head, tail = buffer.getvalue().split(ITEMS_MARKER)
+        yield head
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+        for item in items:
+            buffer.seek(0)
+            buffer.truncate()
+            self.items = [item]
+            self.write_items(handler)
+            yield buffer.getvalue()
+        yield tail
+
+
+class RssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    pass
+
+
+class AtomFeed(StreamingFeedMixin, Atom1Feed):
+    pass
+
+
+class JsonFeed(StreamingFeedMixin, Rss201rev2Feed):
+    """JSON Feed 1.1 (https://jsonfeed.org/version/1.1)."""
+
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def stream(self, items):
+        head = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'language': self.feed['language'],
+        }
+        yield json.dumps(head, ensure_ascii=False)[:-1] + ',"items":['
+        for index, item in enumerate(items):
+            entry = {
+                'id': item['unique_id'],
+                'url': item['link'],
+                'title': item['title'],
+                'content_text': item['description'],
+                'date_published': item['pubdate'].isoformat(),
+                'authors': [{
+                    'name': item['author_name'],
+                    'url': item['author_link'],
+                }],
+                'tags': list(item['categories']),
+            }
+            prefix = ',' if index else ''
+            yield prefix + json.dumps(entry, ensure_ascii=False)
+        yield ']}'
+
+
+FORMATS = {
+    'rss': RssFeed,
+    'atom': AtomFeed,
+    'json': JsonFeed,
+}
+
+
+def feed_posts(queryset):
+    """Узкая выборка: только то, что попадает в элементы фида."""
+
+    return (
+        queryset.select_related('author', 'group')
+        .only(
+            'text', 'pub_date', 'author__username', 'author__first_name',
+            'author__last_name', 'group__title',
+        )
+        .order_by(*CursorPaginator.ordering)
+        [:settings.SYNDICATION_ITEMS]
+    )
+
+
+def _items(feed, request, posts):
+    for post in posts:
+        author = post.author
+        yield feed.make_item(
+            title=post.text[:60],
+            link=request.build_absolute_uri(
+                reverse('posts:post_detail', args=(post.pk,))
+            ),
+            description=post.text,
+            author_name=author.get_full_name() or author.username,
+            author_link=request.build_absolute_uri(
+                reverse('posts:profile', args=(author.username,))
+            ),
+            pubdate=post.pub_date,
+            unique_id=f'yatube-post-{post.pk}',
+            categories=[post.group.title] if post.group else (),
+        )
+
+
+def _cached_stream(key, chunks):
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(body), settings.FEED_CACHE_TIMEOUT)
+
+
+def feed_response(request, fmt, scope, title, link, queryset):
+    """Ответ с фидом формата ``fmt``; тело берется из кэша, если есть.
+
+    Ключ кэша включает поколения ленты ``scope``, поэтому новый пост
+    автоматически делает сохраненное тело неактуальным. В теле
+    абсолютные ссылки, поэтому в ключе еще схема и хост запроса.
+    """
+
+    feed_class = FORMATS[fmt]
+    versions = ':'.join(
+        str(value) for value in generations(GLOBAL_SCOPE, scope)
+    )
+    origin = f'{request.scheme}://{request.get_host()}'
+    key = f'syndication:{fmt}:{scope}:{versions}:{origin}'
+    body = cache.get(key)
+    if body is not None:
+        response = HttpResponse(body, content_type=feed_class.content_type)
+    else:
+        feed = feed_class(
+            title=title,
+            link=request.build_absolute_uri(link),
+            description=title,
+            language=settings.LANGUAGE_CODE,
+            feed_url=request.build_absolute_uri(request.path),
+        )
+        posts = feed_posts(queryset)
+        feed.latest = posts.values_list('pub_date', flat=True).first()
+        items = _items(feed, request, posts.iterator())
+        response = StreamingHttpResponse(
+            _cached_stream(key, feed.stream(items)),
+            content_type=feed_class.content_type,
+        )
+    patch_cache_control(
+        response, public=True, max_age=settings.SYNDICATION_MAX_AGE
+    )
+    return response
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше ARCHIVE_AFTER_DAYS вместе с комментариями '
+        'в архивные таблицы. Каждая пачка — отдельная транзакция, поэтому '
+        'прерванный перенос можно просто запустить снова.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            help='Возраст поста в днях; по умолчанию ARCHIVE_AFTER_DAYS.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=archive.BATCH_SIZE,
+            help=f'Постов в пачке, не больше {archive.BATCH_SIZE}.'
+        )
+        parser.add_argument(
+            '--max-batches', type=int,
+            help='Остановиться после стольких пачек.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза между пачками в секундах, чтобы не мешать записи.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        before = archive.cutoff(options['days'])
+        batches = posts = comments = 0
+        while options['max_batches'] is None or (
+            batches < options['max_batches']
+        ):
+            moved, moved_comments = archive.archive_batch(
+                before, options['batch_size']
+            )
+            if not moved:
+                break
+            batches += 1
+            posts += moved
+            comments += moved_comments
+            self.stdout.write(
+                f'Пачка {batches}: постов {moved}, '
+                f'комментариев {moved_comments}'
+            )
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(
+            f'Перенесено постов: {posts}, комментариев: {comments}, '
+            f'граница: {before:%Y-%m-%d %H:%M}'
+        )
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from posts import seeding
+from posts.benchmark import PERCENTILES, Harness, compare
+
+BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет тестовую базу, прогоняет смесь запросов к лентам и '
+        'сравнивает число SQL-запросов (с --check-timings — и задержки) '
+        'с эталоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=seeding.SCALES, default='small',
+            help='Размер набора данных.'
+        )
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--baseline', default=BASELINE,
+            help='Файл эталона (JSON).'
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результат как новый эталон.'
+        )
+        parser.add_argument(
+            '--check-timings', action='store_true',
+            help='Сравнивать и задержку p95 с пропускной способностью; '
+                 'только для эталона, снятого на этой же машине.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимое ухудшение задержки и пропускной способности.'
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не пересоздавать тестовую базу и набор данных.'
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+            keepdb=options['keepdb']
+        )
+        try:
+            with tempfile.TemporaryDirectory() as media, override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                MEDIA_ROOT=media,
+                PERFORMANCE_SAMPLE_RATE=0,
+                PERFORMANCE_SLOW_REQUEST_MS=float('inf'),
+            ):
+                results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+        self.report(results)
+        if options['save_baseline']:
+            results['scale'] = options['scale']
+            with open(options['baseline'], 'w') as baseline:
+                json.dump(results, baseline, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Эталон записан в {options['baseline']}")
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write('Эталона нет, сравнение пропущено.')
+            return
+        with open(options['baseline']) as baseline:
+            baseline = json.load(baseline)
+        if baseline.get('scale') != options['scale']:
+            raise CommandError(
+                f"Эталон снят на наборе {baseline.get('scale')}, "
+                f"а прогон — на {options['scale']}."
+            )
+        problems = compare(
+            results, baseline, options['tolerance'], options['check_timings']
+        )
+        if problems:
+            raise CommandError(
+                'Регрессии производительности:\n' + '\n'.join(problems)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def run(self, options):
+        from posts.models import Post
+
+        cache.clear()
+        if not (options['keepdb'] and Post.objects.exists()):
+            counts = seeding.seed(
+                rng_seed=options['seed'], log=self.stdout.write,
+                **seeding.SCALES[options['scale']]
+            )
+            self.stdout.write(f'Набор данных: {counts}')
+        harness = Harness(rng_seed=options['seed'])
+        return harness.run(options['requests'], options['warmup'])
+
+    def report(self, results):
+        columns = ['count', *(f'p{rank}' for rank in PERCENTILES), 'queries']
+        self.stdout.write(f"{'view':<14}" + ''.join(
+            f'{column:>10}' for column in columns
+        ))
+        for view, summary in results['views'].items():
+            self.stdout.write(f'{view:<14}' + ''.join(
+                f'{summary[column]:>10}' for column in columns
+            ))
+        self.stdout.write(f"Запросов в секунду: {results['throughput']}")
@@ -0,0 +1,105 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from core.warmup import django_engines, measure, template_names
+from posts.forms import PostForm
+from posts.models import Post
+from posts.utils import comments_page, pagination
+
+DUMMY_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны и печатает стоимость разбора и '
+        'рендеринга каждого. Завершается ошибкой, если какой-то шаблон '
+        'не разбирается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--prefix', default='',
+            help='Только шаблоны с этим префиксом, например posts/.'
+        )
+        parser.add_argument(
+            '--no-render', action='store_true',
+            help='Не рендерить, только разбирать.'
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        rows = []
+        broken = {}
+        # Кэш фрагментов отключен: иначе рендеринг после первого
+        # повтора сводился бы к чтению из кэша.
+        with override_settings(CACHES=DUMMY_CACHE):
+            context = None if options['no_render'] else sample_context(
+                request
+            )
+            for engine in django_engines():
+                for name in template_names(engine):
+                    if not name.startswith(options['prefix']):
+                        continue
+                    try:
+                        rows.append((name, *measure(
+                            engine, name, context, request,
+                            options['repeat'], not options['no_render']
+                        )))
+                    except Exception as error:
+                        broken[name] = error
+        self.report(rows, options['no_render'])
+        if broken:
+            raise CommandError('Шаблоны с ошибками:\n' + '\n'.join(
+                f'{name}: {error}' for name, error in broken.items()
+            ))
+
+    def report(self, rows, no_render):
+        rows.sort(key=lambda row: row[1], reverse=True)
+        self.stdout.write(f"{'template':<48}{'compile, ms':>12}"
+                          f"{'render, ms':>16}")
+        for name, compile_time, render_time, error in rows:
+            if no_render:
+                render = ''
+            elif render_time is None:
+                render = type(error).__name__
+            else:
+                render = f'{render_time * 1000:.2f}'
+            self.stdout.write(
+                f'{name:<48}{compile_time * 1000:>12.2f}{render:>16}'
+            )
+        total = sum(row[1] for row in rows)
+        self.stdout.write(
+            f'Шаблонов: {len(rows)}, разбор всех: {total * 1000:.1f} мс'
+        )
+
+
+def sample_context(request):
+    """Контекст из первых постов базы; пустой базе хватит форм."""
+
+    post = Post.objects.for_feed().first()
+    context = {
+        'page_obj': pagination(request, Post.objects.for_feed()),
+        'form': PostForm(),
+        'feed_cache_timeout': 0,
+        'feed_cache_key': 'build_templates',
+        'comments_order': 'oldest',
+    }
+    if post is not None:
+        context.update({
+            'post': post,
+            'author': post.author,
+            'group': post.group,
+            'title': post.text[:30],
+            'comments': comments_page(
+                request, post.comments.select_related('author').order_by(
+                    'created', 'pk'
+                )
+            ),
+        })
+    return context
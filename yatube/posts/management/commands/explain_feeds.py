@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.utils import CursorPaginator
+
+
+class Command(BaseCommand):
+    help = 'Печатает планы запросов, которые выполняют представления лент.'
+
+    def feed(self, queryset, **options):
+        paginator = CursorPaginator(queryset, settings.POSTS_AMOUNT,
+                                    **options)
+        return queryset.order_by(*paginator.ordering)[
+            :settings.POSTS_AMOUNT + 1
+        ]
+
+    def querysets(self):
+        group = Group.objects.first()
+        author = User.objects.filter(posts__isnull=False).first()
+        reader = User.objects.filter(follower__isnull=False).first()
+        post = Post.objects.first()
+        feed = Post.objects.for_feed()
+        yield 'index', self.feed(feed)
+        if group is not None:
+            yield 'group_posts', self.feed(feed.filter(group=group))
+        if author is not None:
+            yield 'profile', self.feed(feed.filter(author=author))
+        if reader is not None:
+            yield 'follow_index', self.feed(
+                Post.objects.for_timeline(reader),
+                key='timeline_date', tiebreaker='timeline_post'
+            )
+            yield 'follow_identify', Follow.objects.filter(
+                user=reader, author=author
+            )
+        if post is not None:
+            yield 'post_detail', Post.objects.select_related(
+                'author__profile', 'group'
+            ).filter(pk=post.pk)
+            yield 'post_detail comments', Comment.objects.filter(
+                post=post.pk
+            ).order_by('created')
+
+    def handle(self, *args, **options):
+        for name, queryset in self.querysets():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает группы, посты, комментарии и подписки в JSON Lines '
+        'или CSV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--format', choices=transfer.WRITERS,
+            help='Формат; по умолчанию по расширению файла.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=transfer.CHUNK_SIZE
+        )
+        parser.add_argument(
+            '--copy-media', metavar='DIR',
+            help='Скопировать картинки постов в каталог.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or transfer.guess_format(path)
+        rows = transfer.export_rows(options['chunk_size'])
+        if options['copy_media']:
+            rows = transfer.copy_media(rows, options['copy_media'])
+        if path == '-':
+            count = transfer.WRITERS[fmt](rows, sys.stdout)
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                count = transfer.WRITERS[fmt](rows, stream)
+        self.stderr.write(f'Записей выгружено: {count}')
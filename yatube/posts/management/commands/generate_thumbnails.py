@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts import thumbnails
+from posts.models import Post
+
+CHUNK_SIZE = 1000
+
+
+def _generate(post_id):
+    try:
+        return post_id, thumbnails.generate(post_id), None
+    except Exception as error:
+        return post_id, None, error
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Строит превью для постов с картинками в несколько потоков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.THUMBNAIL_WORKERS,
+            help='Число потоков.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить и уже готовые превью.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['force']:
+            posts = posts.filter(thumbnail='')
+        ids = posts.values_list('pk', flat=True).iterator()
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for chunk in iter(lambda: list(islice(ids, CHUNK_SIZE)), []):
+                for post_id, url, error in pool.map(_generate, chunk):
+                    if error is not None:
+                        failed += 1
+                        self.stderr.write(f'Пост {post_id}: {error}')
+                    elif url:
+                        done += 1
+        self.stdout.write(f'Превью построено: {done}, ошибок: {failed}')
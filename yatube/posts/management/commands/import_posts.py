@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает группы, посты, комментарии и подписки из JSON Lines '
+        'или CSV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки; по умолчанию stdin.'
+        )
+        parser.add_argument(
+            '--format', choices=transfer.READERS,
+            help='Формат; по умолчанию по расширению файла.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=transfer.BATCH_SIZE
+        )
+        parser.add_argument(
+            '--copy-media', metavar='DIR',
+            help='Каталог, из которого скопировать картинки постов.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or transfer.guess_format(path)
+        importer = transfer.Importer(
+            media_dir=options['copy_media'],
+            batch_size=options['batch_size']
+        )
+        if path == '-':
+            counts = importer.load(transfer.READERS[fmt](sys.stdin))
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                counts = importer.load(transfer.READERS[fmt](stream))
+        self.stdout.write(
+            'Загружено: ' + ', '.join(
+                f'{model}={count}' for model, count in counts.items()
+            ) + f', пропущено: {importer.skipped}'
+        )
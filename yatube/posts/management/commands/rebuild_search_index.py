@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Создает и перестраивает FTS5-индекс постов.'
+
+    def handle(self, *args, **options):
+        if not search.is_supported(connection):
+            raise CommandError(
+                'Полнотекстовый поиск работает только на SQLite'
+            )
+        search.ensure_index(connection, rebuild=True)
+        self.stdout.write('Поисковый индекс перестроен')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счетчики постов, профилей и '
+        'групп.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            profiles = counters.recount_profiles()
+            posts = counters.recount_comments()
+            groups = counters.recount_groups()
+        counters.reset_feed_count(['index'])
+        self.stdout.write(
+            f'Исправлено профилей: {profiles}, постов: {posts}, '
+            f'групп: {groups}'
+        )
@@ -0,0 +1,49 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует пользователей, группы, посты, комментарии, подписки и '
+        'картинки пачками bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=seeding.SCALES, default='small',
+            help='Готовый размер набора; отдельные числа его уточняют.'
+        )
+        for name in ('users', 'groups', 'posts', 'comments', 'images'):
+            parser.add_argument(f'--{name}', type=int)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Процессов для генерации картинок.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        sizes = dict(seeding.SCALES[options['scale']])
+        for name in sizes:
+            if options[name] is not None:
+                sizes[name] = options[name]
+        started = time.monotonic()
+
+        def log(message):
+            self.stdout.write(f'[{time.monotonic() - started:7.1f} с] '
+                              f'{message}')
+
+        counts = seeding.seed(
+            follows=options['follows'], rng_seed=options['seed'],
+            workers=options['workers'], log=log, **sizes
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Готово: ' + ', '.join(f'{k}={v}' for k, v in counts.items())
+        ))
@@ -3,6 +3,84 @@ from django.db import models
 
 User = get_user_model()
 
+FEED_FIELDS = (
+    'text',
+    'pub_date',
+    'image',
+    'thumbnail',
+    'image_variants',
+    'comments_count',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__title',
+    'group__slug',
+)
+
+
+class PostQuerySet(models.QuerySet):
+    archive = None
+
+    def for_feed(self):
+        """Посты для лент: автор и группа одним JOIN, без лишних колонок."""
+
+        return self.select_related('author', 'group').only(*FEED_FIELDS)
+
+    def for_timeline(self, user):
+        """Лента подписок ``user`` в порядке его записей TimelineEntry.
+
+        Ключ и тай-брейк (``timeline_date``, ``timeline_post``) берутся
+        из самой записи ленты, поэтому страница читается одним
+        диапазоном индекса timeline_user_date_idx без сортировки.
+        Аннотации держат фильтры курсора на том же JOIN, что и отбор
+        по пользователю. Записи перенесенных постов остаются в ленте и
+        продолжают ее в архиве: дата записи совпадает с датой поста.
+        """
+
+        archive = ArchivedPost.objects.for_feed().filter(
+            pk__in=TimelineEntry.objects.filter(user=user).values('post')
+        ).annotate(
+            timeline_date=models.F('pub_date'),
+            timeline_post=models.F('id'),
+        )
+        return self.for_feed().filter(timeline__user=user).annotate(
+            timeline_date=models.F('timeline__pub_date'),
+            timeline_post=models.F('timeline__post'),
+        ).with_archive(archive)
+
+    def with_archive(self, archive=None, **filters):
+        """Лента, продолжающаяся в архиве (ArchivedPost) с ``filters``.
+
+        Архивные посты всегда старше горячих, поэтому keyset-паджинатор
+        обращается к архиву, только когда курсор уходит за последний
+        горячий пост; ``count`` складывает обе части. Готовую выборку
+        архива со своими колонками можно передать в ``archive``.
+        """
+
+        if archive is None:
+            archive = ArchivedPost.objects.for_feed()
+        clone = self._chain()
+        clone.archive = archive.filter(**filters)
+        return clone
+
+    def partitions(self):
+        """Горячая часть и архив (или None) в порядке от новых к старым."""
+
+        hot = self._chain()
+        hot.archive = None
+        return hot, self.archive
+
+    def count(self):
+        total = super().count()
+        if self.archive is not None:
+            total += self.archive.count()
+        return total
+
+    def _clone(self):
+        clone = super()._clone()
+        clone.archive = self.archive
+        return clone
+
 
 class Post(models.Model):
     text = models.TextField()
@@ -24,9 +102,25 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    thumbnail = models.CharField(max_length=255, blank=True, editable=False)
+    image_variants = models.TextField(blank=True, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date', )
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_date_idx'),
+            models.Index(
+                fields=['group', '-pub_date'],
+                name='post_group_date_idx'),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_date_id_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -36,6 +130,7 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.title
@@ -55,6 +150,13 @@ class Comment(models.Model):
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx'),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -72,6 +174,121 @@ class Follow(models.Model):
     class Meta:
         constraints = [
             models.UniqueConstraint(
-                fields=['author'],
-                name='unique_author')
+                fields=['user', 'author'],
+                name='unique_follow')
+        ]
+
+
+class Profile(models.Model):
+    """Денормализованные счетчики пользователя."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='profile'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.user)
+
+
+class TimelineEntry(models.Model):
+    """Запись персональной ленты подписчика (fan-out on write).
+
+    ``post`` — id поста в горячей таблице или, после переноса, в
+    архиве, поэтому ограничения внешнего ключа в базе нет.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_constraint=False
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_post')
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_date_idx')
+        ]
+
+
+class ArchivedPost(models.Model):
+    """Пост старше ARCHIVE_AFTER_DAYS; id сохраняется из posts_post."""
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    pub_date = models.DateTimeField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        'Group',
+        models.SET_NULL,
+        related_name='archived_posts',
+        blank=True,
+        null=True
+    )
+    image = models.ImageField(upload_to='posts/', blank=True)
+    thumbnail = models.CharField(max_length=255, blank=True)
+    image_variants = models.TextField(blank=True)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-pub_date', )
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='archived_author_date_idx'),
+            models.Index(
+                fields=['group', '-pub_date'],
+                name='archived_group_date_idx'),
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='archived_date_id_idx'),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        models.CASCADE,
+        related_name='archived_comments'
+    )
+    text = models.TextField()
+    created = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='archived_comment_created_idx'),
         ]
@@ -0,0 +1,291 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Индекс ``posts_post_fts`` хранит только токены (external content) и
+синхронизируется с ``posts_post`` и ``posts_archivedpost`` триггерами,
+поэтому его обновляют и ``bulk_create``, и ``update()``. Текст для
+сниппетов берется из представления ``posts_post_search`` над обеими
+таблицами: id при переносе в архив сохраняется, поэтому найденный пост
+ищется сначала в горячей таблице, потом в архиве. Схема SQLite
+пересобирает таблицы при миграциях и теряет триггеры, а представление
+мешает ей переименовывать таблицы, поэтому ``drop_content`` вызывается
+перед каждым ``migrate``, а ``ensure_index`` — после.
+"""
+import re
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from django.utils.html import escape
+
+from .models import ArchivedPost, Post
+from .utils import LAST, NEXT, PREVIOUS, dump_token, load_token
+
+TABLE = 'posts_post_fts'
+CONTENT = 'posts_post_search'
+CONTENT_SQL = (
+    f'CREATE VIEW {CONTENT} AS '
+    f'SELECT id, text FROM posts_post UNION ALL '
+    f'SELECT id, text FROM posts_archivedpost'
+)
+TABLE_SQL = (
+    f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+    f"text, content='{CONTENT}', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+
+
+def _triggers(table):
+    return {
+        f'{table}_fts_insert': (
+            f'AFTER INSERT ON {table} BEGIN '
+            f'INSERT INTO {TABLE}(rowid, text) VALUES (new.id, new.text); END'
+        ),
+        f'{table}_fts_delete': (
+            f'AFTER DELETE ON {table} BEGIN '
+            f"INSERT INTO {TABLE}({TABLE}, rowid, text) "
+            f"VALUES ('delete', old.id, old.text); END"
+        ),
+        f'{table}_fts_update': (
+            f'AFTER UPDATE OF text ON {table} BEGIN '
+            f"INSERT INTO {TABLE}({TABLE}, rowid, text) "
+            f"VALUES ('delete', old.id, old.text); "
+            f'INSERT INTO {TABLE}(rowid, text) VALUES (new.id, new.text); END'
+        ),
+    }
+
+
+# Вставки в архив индексирует сам перенос (``index_archived``): триггер
+# вставки продублировал бы еще не удаленную горячую строку. Триггеры не
+# ссылаются на другие таблицы — иначе SQLite не даст мигрировать их.
+TRIGGERS = _triggers('posts_post')
+TRIGGERS.update(
+    (name, body) for name, body in _triggers('posts_archivedpost').items()
+    if not name.endswith('_insert')
+)
+
+MARK_START = '\x02'
+MARK_END = '\x03'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def drop_content(using=connection):
+    """Убирает представление с текстом перед миграцией таблиц постов."""
+
+    if is_supported(using):
+        with using.cursor() as cursor:
+            cursor.execute(f'DROP VIEW IF EXISTS {CONTENT}')
+
+
+def ensure_index(using=connection, rebuild=False):
+    """Создает FTS5-таблицу, представление и триггеры, если их нет.
+
+    Объекты с устаревшим определением пересоздаются; если что-то
+    менялось, индекс перестраивается по обеим таблицам постов.
+    """
+
+    if not is_supported(using):
+        return False
+    expected = {
+        CONTENT: CONTENT_SQL,
+        TABLE: TABLE_SQL,
+        **{name: f'CREATE TRIGGER {name} {body}'
+           for name, body in TRIGGERS.items()},
+    }
+    with using.cursor() as cursor:
+        tables = set(using.introspection.table_names(cursor))
+        if not {Post._meta.db_table, ArchivedPost._meta.db_table} <= tables:
+            # Частичная миграция: таблиц постов еще нет.
+            return False
+        cursor.execute(
+            f"SELECT name, type, sql FROM sqlite_master WHERE name IN "
+            f"({', '.join(['%s'] * len(expected))})",
+            list(expected)
+        )
+        existing = {name: (kind, sql) for name, kind, sql in cursor}
+        for name, sql in expected.items():
+            if name in existing and existing[name][1] == sql:
+                continue
+            if name in existing:
+                cursor.execute(f'DROP {existing[name][0].upper()} {name}')
+            cursor.execute(sql)
+            # Представление данных не хранит: перестройка не нужна.
+            rebuild = rebuild or name != CONTENT
+        if rebuild:
+            cursor.execute(
+                f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')"
+            )
+    return rebuild
+
+
+def index_archived(cursor, ids):
+    """Возвращает в индекс посты ``ids``, только что перенесенные в архив.
+
+    Удаление горячей строки убрало их из индекса триггером.
+    """
+
+    if not is_supported(cursor.db):
+        return
+    cursor.execute(
+        f'INSERT INTO {TABLE}(rowid, text) '
+        f'SELECT id, text FROM {ArchivedPost._meta.db_table} '
+        f"WHERE id IN ({', '.join(['%s'] * len(ids))})",
+        ids
+    )
+
+
+def match_expression(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово ищется как префикс, все слова должны встретиться.
+    """
+
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+
+def highlight(snippet):
+    return (
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def filter_matching(queryset, query):
+    """Оставляет в выборке постов только найденные по ``query``.
+
+    ``pk__in=RawSQL(...)`` здесь не подходит: Django оборачивает
+    подзапрос во вторые скобки, и SQLite сравнивает id только с
+    первой найденной строкой.
+    """
+
+    return queryset.extra(
+        where=[
+            f'{Post._meta.db_table}.id IN '
+            f'(SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s)'
+        ],
+        params=[match_expression(query)]
+    )
+
+
+class SearchPaginator(Paginator):
+    """Keyset-паджинатор по паре (релевантность bm25, id)."""
+
+    def __init__(self, query, per_page):
+        super().__init__([], per_page)
+        self.expression = match_expression(query)
+
+    @cached_property
+    def count(self):
+        if not self.expression:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {TABLE} WHERE {TABLE} MATCH %s',
+                [self.expression]
+            )
+            return cursor.fetchone()[0]
+
+    def _fetch(self, after=None, reverse=False, limit=None):
+        sql = (
+            f'SELECT rowid, bm25({TABLE}) AS rank, '
+            f"snippet({TABLE}, 0, %s, %s, '…', 24) "
+            f'FROM {TABLE} WHERE {TABLE} MATCH %s'
+        )
+        params = [MARK_START, MARK_END, self.expression]
+        if after is not None:
+            sign = '<' if reverse else '>'
+            sql += (
+                f' AND (bm25({TABLE}) {sign} %s OR '
+                f'(bm25({TABLE}) = %s AND rowid {sign} %s))'
+            )
+            params += [after[0], after[0], after[1]]
+        order = 'DESC' if reverse else 'ASC'
+        sql += f' ORDER BY rank {order}, rowid {order} LIMIT %s'
+        params.append(limit or self.per_page + 1)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def cursor_page(self, cursor=None):
+        direction = after = None
+        number = 1
+        if cursor:
+            try:
+                direction, rank, pk, number = load_token(cursor)
+                if direction != LAST:
+                    after = (float(rank), int(pk))
+                    number = int(number)
+            except (ValueError, TypeError):
+                direction = None
+                number = 1
+        if not self.expression:
+            rows = []
+        elif direction == LAST:
+            return self.last_page()
+        elif direction == PREVIOUS:
+            rows = self._fetch(after, reverse=True)
+            has_previous = len(rows) > self.per_page
+            rows = list(reversed(rows[:self.per_page]))
+            if not has_previous:
+                number = 1
+            return self._build_page(rows, number, has_previous, True)
+        elif direction == NEXT:
+            rows = self._fetch(after)
+        else:
+            rows = self._fetch()
+            number = 1
+        has_next = len(rows) > self.per_page
+        return self._build_page(
+            rows[:self.per_page], number, direction == NEXT, has_next
+        )
+
+    def last_page(self):
+        """Последняя страница в границах остальных: с конца выдачи."""
+
+        number = self.num_pages
+        size = self.count - (number - 1) * self.per_page or self.per_page
+        rows = self._fetch(reverse=True, limit=size + 1)
+        has_previous = len(rows) > size
+        rows = list(reversed(rows[:size]))
+        if not has_previous:
+            number = 1
+        return self._build_page(rows, number, has_previous, False)
+
+    def _build_page(self, rows, number, has_previous, has_next):
+        ids = [row[0] for row in rows]
+        posts = Post.objects.for_feed().in_bulk(ids)
+        archived = [pk for pk in ids if pk not in posts]
+        if archived:
+            posts.update(ArchivedPost.objects.for_feed().in_bulk(archived))
+        results = []
+        for pk, rank, snippet in rows:
+            post = posts.get(pk)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                results.append(post)
+        page = Page(results, number, self)
+        page.next_cursor = page.previous_cursor = page.last_cursor = None
+        # Номера страниц потребовали бы COUNT по индексу на каждую
+        # страницу выдачи, поэтому окна нет: «Первая» и «Последняя».
+        page.page_window = []
+        if rows and has_next:
+            page.next_cursor = dump_token(
+                [NEXT, rows[-1][1], rows[-1][0], number + 1]
+            )
+            page.last_cursor = dump_token([LAST, None, None, None])
+        if rows and has_previous:
+            page.previous_cursor = dump_token(
+                [PREVIOUS, rows[0][1], rows[0][0], number - 1]
+            )
+        return page
+
+
+def search_page(request):
+    query = request.GET.get('q', '').strip()
+    paginator = SearchPaginator(query, settings.POSTS_AMOUNT)
+    return query, paginator.cursor_page(request.GET.get('cursor'))
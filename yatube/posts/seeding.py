@@ -0,0 +1,338 @@
+"""Синтетический набор данных для нагрузочных прогонов.
+
+Популярность авторов и групп распределена по закону Ципфа: немногие
+пишут и собирают подписчиков больше всех остальных вместе взятых.
+Число подписок у пользователя берется из распределения Парето. Все
+пишется через ``bulk_create``, поэтому сигналы не срабатывают, и
+профили, счетчики комментариев и ленты заполняются здесь же.
+"""
+import io
+import random
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from heapq import merge
+from itertools import accumulate, islice, repeat
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+from . import caching, counters, search
+from .models import (Comment, Follow, Group, Post, Profile, TimelineEntry,
+                     User)
+
+SCALES = {
+    'small': {
+        'users': 200, 'groups': 20, 'posts': 5_000,
+        'comments': 5_000, 'images': 20,
+    },
+    'medium': {
+        'users': 5_000, 'groups': 1_000, 'posts': 200_000,
+        'comments': 200_000, 'images': 500,
+    },
+    'large': {
+        'users': 50_000, 'groups': 5_000, 'posts': 2_000_000,
+        'comments': 1_000_000, 'images': 5_000,
+    },
+}
+BATCH_SIZE = 5_000
+PERIOD = timedelta(days=2 * 365)
+IMAGE_SIZE = (960, 640)
+WORDS = (
+    'лето', 'город', 'река', 'дорога', 'книга', 'утро', 'вечер', 'море',
+    'друг', 'работа', 'музыка', 'кофе', 'поезд', 'дом', 'сад', 'ветер',
+    'снег', 'солнце', 'кино', 'python', 'django', 'новости', 'фото',
+    'путешествие', 'горы', 'лес', 'кот', 'собака', 'праздник', 'мысль',
+)
+
+
+def zipf_weights(count, exponent=1.1):
+    """Накопленные веса для ``random.choices(cum_weights=...)``."""
+
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, count + 1)))
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Позволяет задать даты полям с ``auto_now_add``."""
+
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def render_image(index, rng_seed=0):
+    """JPEG-градиент; выполняется в отдельном процессе, без Django."""
+
+    rng = random.Random(rng_seed * 1_000_003 + index)
+    start, end = (
+        Image.new('RGB', IMAGE_SIZE, tuple(rng.randrange(256)
+                                           for _ in range(3)))
+        for _ in range(2)
+    )
+    mask = Image.linear_gradient('L').resize(IMAGE_SIZE)
+    buffer = io.BytesIO()
+    Image.composite(start, end, mask).save(buffer, 'JPEG', quality=80)
+    return buffer.getvalue()
+
+
+def seed_images(count, workers=1, rng_seed=0):
+    """Картинки для постов; кодирование JPEG идет в ``workers`` процессах."""
+
+    if count <= 0:
+        return []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            images = pool.map(render_image, range(count), repeat(rng_seed),
+                              chunksize=16)
+            return [_save_image(index, data)
+                    for index, data in enumerate(images)]
+    return [_save_image(index, render_image(index, rng_seed))
+            for index in range(count)]
+
+
+def _save_image(index, data):
+    return default_storage.save(f'posts/seed_{index}.jpg', ContentFile(data))
+
+
+@contextmanager
+def search_triggers_paused():
+    """Снимает триггеры FTS на время вставки и перестраивает индекс.
+
+    Одна перестройка после загрузки дешевле триггера на каждую строку.
+    """
+
+    if search.is_supported():
+        with connection.cursor() as cursor:
+            for name in search.TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    try:
+        yield
+    finally:
+        search.ensure_index(rebuild=True)
+
+
+def _batches(objects, size=BATCH_SIZE):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_rows(model, columns, rows):
+    """``executemany`` без моделей: для самых больших таблиц набора."""
+
+    quote = connection.ops.quote_name
+    sql = (
+        f'INSERT INTO {quote(model._meta.db_table)} '
+        f"({', '.join(map(quote, columns))}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    with connection.cursor() as cursor:
+        for batch in _batches(rows):
+            cursor.executemany(sql, batch)
+
+
+def _new_ids(model, after, count):
+    return list(
+        model.objects.filter(pk__gt=after).order_by('pk')
+        .values_list('pk', flat=True)[:count]
+    )
+
+
+def _last_pk(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True)
+    return last.first() or 0
+
+
+def _post_date(now, index, total):
+    return now - PERIOD * (1 - index / total)
+
+
+def seed_users(count, prefix):
+    last = _last_pk(User)
+    for batch in _batches(User(username=f'{prefix}{i}', password='!')
+                          for i in range(count)):
+        User.objects.bulk_create(batch)
+    return _new_ids(User, last, count)
+
+
+def seed_groups(count, prefix):
+    last = _last_pk(Group)
+    for batch in _batches(Group(title=f'Сообщество {prefix}{i}',
+                                slug=f'{prefix}{i}',
+                                description='Сгенерированное сообщество')
+                          for i in range(count)):
+        Group.objects.bulk_create(batch)
+    return _new_ids(Group, last, count)
+
+
+def seed_posts(rng, now, count, user_ids, group_ids, comment_targets,
+               images=()):
+    """Посты с авторами и группами по Ципфу.
+
+    Вернет id постов и номера постов каждого автора по возрастанию даты.
+    """
+
+    user_weights = zipf_weights(len(user_ids))
+    group_weights = zipf_weights(len(group_ids))
+    by_author = defaultdict(list)
+
+    def objects():
+        for i in range(count):
+            author = rng.choices(user_ids, cum_weights=user_weights)[0]
+            by_author[author].append(i)
+            group = None
+            if group_ids and rng.random() < 0.7:
+                group = rng.choices(group_ids, cum_weights=group_weights)[0]
+            words = rng.choices(WORDS, k=rng.randint(5, 60))
+            yield Post(
+                text=f'Запись {i}: ' + ' '.join(words),
+                author_id=author,
+                group_id=group,
+                pub_date=_post_date(now, i, count),
+                image=images[i] if i < len(images) else '',
+                comments_count=comment_targets[i],
+            )
+
+    last = _last_pk(Post)
+    with explicit_dates(Post._meta.get_field('pub_date')):
+        for batch in _batches(objects()):
+            Post.objects.bulk_create(batch)
+    return _new_ids(Post, last, count), by_author
+
+
+def seed_comments(rng, now, post_ids, user_ids, comment_targets):
+    def objects():
+        for index, total in comment_targets.items():
+            post_date = _post_date(now, index, len(post_ids))
+            for n in range(total):
+                yield Comment(
+                    post_id=post_ids[index],
+                    author_id=rng.choice(user_ids),
+                    text=' '.join(rng.choices(WORDS, k=8)),
+                    created=post_date + timedelta(minutes=n + 1),
+                )
+
+    with explicit_dates(Comment._meta.get_field('created')):
+        for batch in _batches(objects()):
+            Comment.objects.bulk_create(batch)
+
+
+def seed_follows(rng, user_ids, average):
+    """Подписки: число по Парето, авторы по Ципфу."""
+
+    weights = zipf_weights(len(user_ids))
+    pairs = set()
+    for user in user_ids:
+        wanted = min(int(rng.paretovariate(1.2) * average / 5),
+                     len(user_ids) - 1)
+        for author in rng.choices(user_ids, cum_weights=weights, k=wanted):
+            if author != user:
+                pairs.add((user, author))
+    for batch in _batches(Follow(user_id=user, author_id=author)
+                          for user, author in pairs):
+        Follow.objects.bulk_create(batch, ignore_conflicts=True)
+    return pairs
+
+
+def seed_profiles(user_ids, posts_by_author, pairs):
+    followers = Counter(author for _, author in pairs)
+    following = Counter(user for user, _ in pairs)
+    for batch in _batches(Profile(user_id=user,
+                                  posts_count=len(posts_by_author[user]),
+                                  followers_count=followers[user],
+                                  following_count=following[user])
+                          for user in user_ids):
+        Profile.objects.bulk_create(batch)
+
+
+def seed_timelines(now, post_ids, posts_by_author, pairs):
+    """Ленты подписок без запросов к постам.
+
+    Номер поста задает его дату, поэтому лента пользователя — это
+    ``TIMELINE_LENGTH`` наибольших номеров среди постов его авторов.
+    """
+
+    authors = defaultdict(list)
+    for user, author in pairs:
+        authors[user].append(author)
+    length = settings.TIMELINE_LENGTH
+    adapt = connection.ops.adapt_datetimefield_value
+
+    def rows():
+        for user, followed in authors.items():
+            newest = merge(*(reversed(posts_by_author[author][-length:])
+                             for author in followed), reverse=True)
+            for index in islice(newest, length):
+                yield (user, post_ids[index],
+                       adapt(_post_date(now, index, len(post_ids))))
+
+    _insert_rows(TimelineEntry, ('user_id', 'post_id', 'pub_date'), rows())
+    return len(authors)
+
+
+def seed(users, groups, posts, comments, images=0, follows=20, rng_seed=0,
+         workers=1, log=None):
+    """Заполняет базу и возвращает число созданных объектов по моделям.
+
+    Каждый этап пишется одной транзакцией: SQLite не синхронизирует
+    журнал после каждой пачки ``bulk_create``.
+    """
+
+    rng = random.Random(rng_seed)
+    log = log or (lambda message: None)
+    now = timezone.now()
+    prefix = f'seed{_last_pk(User)}_'
+    images = min(images, posts)
+
+    image_names = seed_images(images, workers, rng_seed)
+    log(f'Картинок: {len(image_names)}')
+    with transaction.atomic():
+        user_ids = seed_users(users, prefix)
+    log(f'Пользователей: {len(user_ids)}')
+    with transaction.atomic():
+        group_ids = seed_groups(groups, prefix)
+    log(f'Групп: {len(group_ids)}')
+    comment_targets = Counter(
+        rng.randrange(posts) for _ in range(comments if posts else 0)
+    )
+    with search_triggers_paused(), transaction.atomic():
+        post_ids, posts_by_author = seed_posts(
+            rng, now, posts, user_ids, group_ids, comment_targets,
+            image_names
+        )
+    log(f'Постов: {len(post_ids)}')
+    with transaction.atomic():
+        seed_comments(rng, now, post_ids, user_ids, comment_targets)
+    log(f'Комментариев: {comments}')
+    with transaction.atomic():
+        pairs = seed_follows(rng, user_ids, follows)
+    log(f'Подписок: {len(pairs)}')
+    with transaction.atomic():
+        seed_profiles(user_ids, posts_by_author, pairs)
+        timelines = seed_timelines(now, post_ids, posts_by_author, pairs)
+    log(f'Лент собрано: {timelines}')
+    with transaction.atomic():
+        counters.recount_groups()
+    counters.reset_feed_count(['index'])
+    caching.bump(caching.GLOBAL_SCOPE)
+    return {
+        'users': len(user_ids), 'groups': len(group_ids),
+        'posts': len(post_ids), 'comments': comments,
+        'follows': len(pairs), 'images': images,
+    }
@@ -0,0 +1,103 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import jobs
+
+from . import caching, counters, timeline
+from .models import (ArchivedPost, Comment, Follow, Group, Post, Profile,
+                     TimelineEntry, User)
+
+
+@receiver(post_save, sender=User)
+def user_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Post)
+def post_previous_state(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_group_id, instance._previous_author_id = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('group', 'author').first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_group = getattr(instance, '_previous_group_id', None)
+    previous_author = getattr(instance, '_previous_author_id', None)
+    if created:
+        counters.change_profile(instance.author_id, 'posts_count', 1)
+        counters.change_group(instance.group_id, 1)
+        counters.change_feed_count(['index'], 1)
+        jobs.enqueue(
+            'posts.fan_out', instance.pk, key=f'fan-out:{instance.pk}'
+        )
+    else:
+        if previous_group != instance.group_id:
+            counters.change_group(previous_group, -1)
+            counters.change_group(instance.group_id, 1)
+        if previous_author and previous_author != instance.author_id:
+            counters.change_profile(previous_author, 'posts_count', -1)
+            counters.change_profile(instance.author_id, 'posts_count', 1)
+    caching.bump(*caching.post_scopes(
+        instance, previous_group, previous_author
+    ))
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_profile(instance.author_id, 'posts_count', -1)
+    counters.change_group(instance.group_id, -1)
+    counters.change_feed_count(['index'], -1)
+    if sender is ArchivedPost:
+        # Записи лент ссылаются на архив без каскада в ORM.
+        TimelineEntry.objects.filter(post=instance.pk).delete()
+    timeline.forget(instance)
+    caching.bump(*caching.post_scopes(instance))
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_comments(instance.post_id, 1)
+        caching.bump(*caching.post_scopes(instance.post))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comments(instance.post_id, -1)
+    post = Post.objects.filter(pk=instance.post_id).first()
+    if post is not None:
+        caching.bump(*caching.post_scopes(post))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, **kwargs):
+    caching.bump(caching.GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_profile(instance.user_id, 'following_count', 1)
+        counters.change_profile(instance.author_id, 'followers_count', 1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        caching.bump(
+            f'followers:{instance.user_id}', f'followers:{instance.author_id}'
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change_profile(instance.user_id, 'following_count', -1)
+    counters.change_profile(instance.author_id, 'followers_count', -1)
+    timeline.prune(instance.user_id, instance.author_id)
+    caching.bump(
+        f'followers:{instance.user_id}', f'followers:{instance.author_id}'
+    )
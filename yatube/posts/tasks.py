@@ -0,0 +1,50 @@
+"""Фоновые задачи постов для очереди ``core.jobs``."""
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.urls import reverse
+
+from core.jobs import task
+
+from . import thumbnails, timeline
+from .models import Comment, Post
+
+
+@task('posts.thumbnail')
+def build_thumbnail(post_id):
+    thumbnails.generate(post_id)
+
+
+@task('posts.fan_out', batch=True)
+def fan_out(post_ids):
+    """Раскладывает пачку новых постов, уже удаленные пропускаются."""
+
+    posts = Post.objects.filter(pk__in=post_ids).only(
+        'author', 'pub_date'
+    ).order_by('pub_date', 'pk')
+    for post in posts:
+        timeline.fan_out(post)
+
+
+@task('posts.comment_email')
+def comment_email(comment_id):
+    """Письмо автору поста о новом комментарии."""
+
+    comment = Comment.objects.select_related('author', 'post__author').filter(
+        pk=comment_id
+    ).first()
+    if comment is None:
+        return
+    recipient = comment.post.author
+    if not recipient.email or recipient == comment.author:
+        return
+    send_mail(
+        f'Новый комментарий от {comment.author.username}',
+        f'{comment.text}\n\n'
+        + urljoin(settings.SITE_URL, reverse(
+            'posts:post_detail', args=(comment.post_id,)
+        )),
+        None,
+        [recipient.email],
+    )
@@ -0,0 +1,107 @@
+"""Кэш фрагментов для страниц залогиненных пользователей.
+
+Страница делится на общие части и части конкретного пользователя.
+``{% post_card post page_obj %}`` внутри цикла по странице кэширует
+карточку каждого поста (текст, счетчики, миниатюры) одну на всех,
+поэтому лента подписок, собранная из чужих постов, переиспользует уже
+отрендеренные карточки.
+``{% usercache name vary... %}`` кэширует небольшой блок отдельно для
+каждого пользователя: переключатель лент, кнопку подписки, форму
+комментария. CSRF-токен в кэш не попадает — вместо него пишется метка,
+которая заменяется токеном текущего запроса.
+"""
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.safestring import mark_safe
+
+from ..caching import post_card_keys, shared_timeout
+
+register = template.Library()
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+CSRF_PLACEHOLDER = 'csrf-token-fragment-placeholder'
+CARDS_CONTEXT_KEY = 'post_card_pages'
+
+
+def _page_cards(context, page):
+    """Карточки страницы по pk поста.
+
+    Строятся при первом обращении за рендер: одним get_many на всю
+    страницу, отсутствующие рендерятся разом и пишутся одним set_many.
+    Результат запоминается в ``render_context``.
+    """
+
+    pages = context.render_context.setdefault(CARDS_CONTEXT_KEY, {})
+    if id(page) in pages:
+        return pages[id(page)][1]
+    posts = list(page)
+    keys = post_card_keys(posts)
+    cards = cache.get_many(keys)
+    card_template = context.template.engine.get_template(CARD_TEMPLATE)
+    missing = {}
+    for post, key in zip(posts, keys):
+        if key not in cards:
+            with context.push(post=post):
+                missing[key] = card_template.render(context)
+    if missing:
+        cache.set_many(
+            missing, shared_timeout(settings.FRAGMENT_CACHE_TIMEOUT)
+        )
+        cards.update(missing)
+    # Страница хранится рядом, чтобы ее id не достался другому объекту.
+    pages[id(page)] = page, {
+        post.pk: cards[key] for post, key in zip(posts, keys)
+    }
+    return pages[id(page)][1]
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post, page=None):
+    """Карточка поста; ``page`` — страница, чьи карточки строить разом."""
+
+    cards = _page_cards(context, page if page is not None else [post])
+    if post.pk not in cards:
+        cards = _page_cards(context, [post])
+    return mark_safe(cards[post.pk])
+
+
+class UserCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        user = context.get('user')
+        vary_on = [getattr(user, 'pk', None) or 0]
+        vary_on += [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        value = cache.get(key)
+        if value is None:
+            with context.push(csrf_token=CSRF_PLACEHOLDER):
+                value = self.nodelist.render(context)
+            cache.set(
+                key, value, shared_timeout(settings.FRAGMENT_CACHE_TIMEOUT)
+            )
+        token = context.get('csrf_token')
+        if CSRF_PLACEHOLDER in value and token:
+            value = value.replace(CSRF_PLACEHOLDER, str(token))
+        return mark_safe(value)
+
+
+@register.tag
+def usercache(parser, token):
+    """{% usercache name [vary_on ...] %} ... {% endusercache %}"""
+
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' требует имя фрагмента."
+        )
+    nodelist = parser.parse(('endusercache',))
+    parser.delete_first_token()
+    return UserCacheNode(
+        nodelist, bits[1], [parser.compile_filter(bit) for bit in bits[2:]]
+    )
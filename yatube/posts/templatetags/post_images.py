@@ -0,0 +1,17 @@
+import json
+
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_picture(post):
+    """Данные для <picture> из Post.image_variants или None."""
+
+    if not post.image_variants:
+        return None
+    try:
+        return json.loads(post.image_variants)
+    except ValueError:
+        return None
@@ -0,0 +1,186 @@
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, counters
+from ..models import (ArchivedComment, ArchivedPost, Comment, Follow, Group,
+                      Post, TimelineEntry, User)
+
+
+class TestArchive(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Writer')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='archive-group', description='Описание'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        now = timezone.now()
+        cls.posts = []
+        for day in range(15):
+            post = Post.objects.create(
+                text=f'Пост {day}', author=cls.author, group=cls.group
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(days=day * 100)
+            )
+            TimelineEntry.objects.filter(post=post).update(
+                pub_date=now - timedelta(days=day * 100)
+            )
+            cls.posts.append(post.pk)
+        cls.old = cls.posts[8]
+        Comment.objects.create(
+            post_id=cls.old, author=cls.reader, text='Старый комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def archive(self):
+        call_command('archive_posts', days=750, stdout=StringIO())
+
+    def test_moves_old_posts_with_comments(self):
+        """ Тестирование переноса старых постов и комментариев в архив """
+
+        self.archive()
+        self.assertEqual(
+            list(Post.objects.order_by('-pub_date')
+                 .values_list('pk', flat=True)),
+            self.posts[:8]
+        )
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            set(self.posts[8:])
+        )
+        comment = ArchivedComment.objects.get()
+        self.assertEqual(comment.post_id, self.old)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            TimelineEntry.objects.filter(post__in=self.posts[8:]).count(), 7
+        )
+        self.assertEqual(ArchivedPost.objects.get(pk=self.old).comments_count,
+                         1)
+
+    def test_resumes_in_batches(self):
+        """ Тестирование переноса пачками с продолжением """
+
+        out = StringIO()
+        call_command('archive_posts', days=750, batch_size=2, max_batches=1,
+                     stdout=out)
+        self.assertEqual(ArchivedPost.objects.count(), 2)
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            set(self.posts[-2:])
+        )
+        call_command('archive_posts', days=750, batch_size=2, stdout=out)
+        self.assertEqual(ArchivedPost.objects.count(), 7)
+        self.assertEqual(archive.archive_batch(archive.cutoff(750)), (0, 0))
+
+    def test_feeds_reach_into_archive(self):
+        """ Тестирование продолжения лент в архиве """
+
+        self.archive()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).context['page_obj']
+                self.assertEqual([post.pk for post in first], self.posts[:10])
+                self.assertEqual(first.paginator.count, 15)
+                second = self.client.get(
+                    url, {'cursor': first.next_cursor}
+                ).context['page_obj']
+                self.assertEqual([post.pk for post in second],
+                                 self.posts[10:])
+                self.assertIsNone(second.next_cursor)
+                back = self.client.get(
+                    url, {'cursor': second.previous_cursor}
+                ).context['page_obj']
+                self.assertEqual([post.pk for post in back], self.posts[:10])
+                offset = self.client.get(url, {'page': 2}).context['page_obj']
+                self.assertEqual([post.pk for post in offset],
+                                 self.posts[10:])
+                last = self.client.get(
+                    url, {'page': 'last'}
+                ).context['page_obj']
+                self.assertEqual([post.pk for post in last], self.posts[10:])
+
+    def test_follow_feed_reaches_into_archive(self):
+        """ Тестирование ленты подписок с архивными постами """
+
+        self.archive()
+        other = User.objects.create_user(username='Newcomer')
+        Follow.objects.create(user=other, author=self.author)
+        for user in (self.reader, other):
+            with self.subTest(user=user.username):
+                client = Client()
+                client.force_login(user)
+                url = reverse('posts:follow_index')
+                first = client.get(url).context['page_obj']
+                self.assertEqual([post.pk for post in first], self.posts[:10])
+                second = client.get(
+                    url, {'cursor': first.next_cursor}
+                ).context['page_obj']
+                self.assertEqual([post.pk for post in second],
+                                 self.posts[10:])
+        Follow.objects.filter(user=other).delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=other).exists())
+
+    def test_search_finds_archived(self):
+        """ Тестирование поиска по архивным постам """
+
+        self.archive()
+        response = self.client.get(reverse('posts:search'), {'q': 'Пост 9'})
+        posts = response.context['page_obj'].object_list
+        self.assertEqual([post.pk for post in posts], [self.posts[9]])
+        self.assertIn('<mark>', posts[0].snippet)
+        ArchivedPost.objects.filter(pk=self.posts[9]).update(text='Другой')
+        response = self.client.get(reverse('posts:search'), {'q': 'Пост 9'})
+        self.assertEqual(response.context['page_obj'].object_list, [])
+        ArchivedPost.objects.get(pk=self.posts[10]).delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=self.posts[10]).exists()
+        )
+
+    def test_archived_post_detail(self):
+        """ Тестирование страницы архивного поста """
+
+        self.archive()
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:post_detail', args=(self.old,)))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertContains(response, 'Старый комментарий')
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=(self.old,))
+        )
+        response = client.get(
+            reverse('posts:post_comments', args=(self.old,))
+        )
+        self.assertContains(response, 'Старый комментарий')
+
+    def test_counters_include_archive(self):
+        """ Тестирование счетчиков профиля и группы с учетом архива """
+
+        self.archive()
+        self.assertEqual(counters.recount_profiles(), 0)
+        self.assertEqual(counters.recount_groups(), 0)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
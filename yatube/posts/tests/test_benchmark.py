@@ -0,0 +1,98 @@
+import shutil
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from .. import timeline
+from ..benchmark import TRAFFIC_MIX, Harness, compare, percentile
+from ..models import Comment, Follow, Post, Profile, TimelineEntry
+from ..search import filter_matching
+from ..seeding import seed
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def search_page_count(query):
+    return filter_matching(Post.objects.all(), query).count()
+
+
+def tearDownModule():
+    shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestBenchmark(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.counts = seed(
+            users=20, groups=3, posts=200, comments=50, images=2,
+            follows=10, workers=2
+        )
+
+    def test_seed(self):
+        """ Тестирование согласованности сгенерированного набора """
+
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 50)
+        self.assertEqual(Follow.objects.count(), self.counts['follows'])
+        self.assertEqual(Post.objects.exclude(image='').count(), 2)
+        profile = Profile.objects.order_by('-posts_count')[0]
+        self.assertEqual(
+            profile.posts_count,
+            Post.objects.filter(author=profile.user).count()
+        )
+        busiest = Post.objects.order_by('-comments_count')[0]
+        self.assertEqual(busiest.comments_count, busiest.comments.count())
+        user = Follow.objects.values_list('user', flat=True)[0]
+        seeded = set(TimelineEntry.objects.filter(user=user).values_list(
+            'post', 'pub_date'
+        ))
+        timeline.rebuild(user)
+        self.assertEqual(seeded, set(
+            TimelineEntry.objects.filter(user=user).values_list(
+                'post', 'pub_date'
+            )
+        ))
+        self.assertEqual(
+            Post.objects.filter(text__contains='Запись 1:').count(), 1
+        )
+        self.assertEqual(
+            search_page_count('Запись'), Post.objects.count()
+        )
+
+    def test_run_and_compare(self):
+        """ Тестирование прогона смеси запросов и сравнения с эталоном """
+
+        results = Harness().run(requests=60)
+        self.assertEqual(results['requests'], 60)
+        self.assertLessEqual(set(results['views']),
+                             {view for view, _ in TRAFFIC_MIX})
+        for summary in results['views'].values():
+            self.assertLessEqual(summary['p50'], summary['p99'])
+        self.assertEqual(compare(results, results), [])
+        slower = {
+            'throughput': results['throughput'] * 2,
+            # Лента при попадании в кэш может обойтись без запросов.
+            'views': {'post_detail': dict(results['views']['post_detail'],
+                                          p95=0, queries=0)},
+        }
+        self.assertEqual(compare(results, slower),
+                         ['post_detail queries: '
+                          f"{results['views']['post_detail']['queries']} > 0"])
+        problems = compare(results, slower, timings=True)
+        self.assertEqual(len(problems), 3)
+
+    def test_percentile(self):
+        """ Тестирование перцентилей методом ближайшего ранга """
+
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
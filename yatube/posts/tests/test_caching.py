@@ -0,0 +1,109 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.tests.on_commit import run_on_commit
+
+from ..caching import generation
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class TestFeedCache(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test',
+            description='test desc'
+        )
+        for i in range(0, 13):
+            Post.objects.create(
+                text='test text' + str(i),
+                author=cls.author,
+                group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def test_new_post_visible(self):
+        """ Тестирование инвалидации кэша при создании и правке поста """
+
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        )
+        for url in urls:
+            self.guest.get(url)
+        with run_on_commit():
+            post = Post.objects.create(
+                text='fresh post', author=self.author, group=self.group
+            )
+        for url in urls:
+            with self.subTest(value=url):
+                self.assertContains(self.guest.get(url), 'fresh post')
+        with run_on_commit():
+            post.text = 'edited post'
+            post.save()
+            Comment.objects.create(post=post, author=self.author, text='Тест')
+        for url in urls:
+            with self.subTest(value=url):
+                self.assertContains(self.guest.get(url), 'edited post')
+
+    def test_pages_cached_separately(self):
+        """ Тестирование разных страниц одной ленты """
+
+        first = self.guest.get(reverse('posts:index'))
+        second = self.guest.get(
+            reverse('posts:index') + '?cursor='
+            + first.context['page_obj'].next_cursor
+        )
+        self.assertContains(second, 'test text0</p>')
+        self.assertNotContains(first, 'test text0</p>')
+
+    def test_fragment_is_reused(self):
+        """ Тестирование повторного использования фрагмента """
+
+        self.guest.get(reverse('posts:index'))
+        Post.objects.filter(text='test text12').update(text='silent')
+        self.assertContains(self.guest.get(reverse('posts:index')),
+                            'test text12')
+
+    def test_warm_fragment_skips_feed_query(self):
+        """ Тестирование ленты из кэша без выборки постов """
+
+        urls = {
+            reverse('posts:index'): 0,
+            # ETag и сама страница ищут группу по slug.
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}): 2,
+        }
+        for url, queries in urls.items():
+            with self.subTest(value=url):
+                self.guest.get(url)
+                with self.assertNumQueries(queries):
+                    response = self.guest.get(url)
+                self.assertContains(response, 'test text12')
+                self.assertContains(response, 'cursor=')
+
+    def test_generation_moves_after_commit(self):
+        """ Тестирование сдвига поколения только после фиксации """
+
+        before = generation('index')
+        with run_on_commit():
+            Post.objects.create(text='fresh post', author=self.author)
+            self.assertEqual(generation('index'), before)
+        self.assertNotEqual(generation('index'), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
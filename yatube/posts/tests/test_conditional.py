@@ -0,0 +1,103 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.tests.on_commit import run_on_commit
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class TestConditionalGet(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.reader = User.objects.create_user(username='HasName')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test',
+            description='test desc'
+        )
+        cls.post = Post.objects.create(
+            text='test text', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.urls = {
+            'group': reverse('posts:group_list',
+                             kwargs={'slug': self.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': self.author.username}),
+            'post': reverse('posts:post_detail',
+                            kwargs={'post_id': self.post.pk}),
+        }
+
+    def revalidate(self, url, client=None):
+        client = client or self.client
+        etag = client.get(url)['ETag']
+        return etag, client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified(self):
+        """ Тестирование ответа 304 без выборки ленты """
+
+        for name, url in self.urls.items():
+            with self.subTest(value=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=etag
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_etag(self):
+        """ Тестирование смены ETag после изменений """
+
+        changes = {
+            'group': lambda: Post.objects.create(
+                text='new', author=self.reader, group=self.group
+            ),
+            'post': lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Тест'
+            ),
+            'profile': lambda: Follow.objects.create(
+                user=self.reader, author=self.author
+            ),
+        }
+        for name, change in changes.items():
+            with self.subTest(value=name):
+                etag = self.client.get(self.urls[name])['ETag']
+                with run_on_commit():
+                    change()
+                response = self.client.get(
+                    self.urls[name], HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        """ Тестирование разных ETag для разных пользователей """
+
+        url = self.urls['profile']
+        self.assertNotEqual(
+            self.client.get(url)['ETag'],
+            self.reader_client.get(url)['ETag']
+        )
+
+    def test_missing_object(self):
+        """ Тестирование 404 для несуществующих объектов """
+
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': 999})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..counters import feed_count
+from ..models import Comment, Follow, Group, Post, Profile, TimelineEntry
+
+User = get_user_model()
+
+
+class TestCounters(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.reader = User.objects.create_user(username='HasName')
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def profile(self, user):
+        return Profile.objects.get(user=user)
+
+    def test_counters_follow_views(self):
+        """ Тестирование счетчиков при создании постов и подписках """
+
+        post = Post.objects.create(text='test text', author=self.author)
+        self.reader_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+            data={'text': 'Тест'}
+        )
+        self.reader_client.get(
+            reverse('posts:profile_follow',
+                    kwargs={'username': self.author.username})
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.profile(self.author).posts_count, 1)
+        self.assertEqual(self.profile(self.author).followers_count, 1)
+        self.assertEqual(self.profile(self.reader).following_count, 1)
+        self.reader_client.get(
+            reverse('posts:profile_unfollow',
+                    kwargs={'username': self.author.username})
+        )
+        self.assertEqual(self.profile(self.author).followers_count, 0)
+        self.assertEqual(self.profile(self.reader).following_count, 0)
+
+    def test_recount_command(self):
+        """ Тестирование команды recount """
+
+        post = Post.objects.create(text='test text', author=self.author)
+        Comment.objects.create(post=post, author=self.reader, text='Тест')
+        Profile.objects.filter(user=self.author).update(posts_count=7)
+        Post.objects.filter(pk=post.pk).update(comments_count=0)
+        group = Group.objects.create(title='test', slug='test')
+        Post.objects.create(text='test text', author=self.author, group=group)
+        Group.objects.filter(pk=group.pk).update(posts_count=5)
+        call_command('recount', stdout=StringIO())
+        post.refresh_from_db()
+        group.refresh_from_db()
+        self.assertEqual(self.profile(self.author).posts_count, 2)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(group.posts_count, 1)
+
+    def test_group_posts_count(self):
+        """ Тестирование счетчика постов группы при записи """
+
+        first = Group.objects.create(title='first', slug='first')
+        second = Group.objects.create(title='second', slug='second')
+        post = Post.objects.create(
+            text='test text', author=self.author, group=first
+        )
+        post.group = second
+        post.save()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.posts_count, second.posts_count), (0, 1))
+        post.delete()
+        second.refresh_from_db()
+        self.assertEqual(second.posts_count, 0)
+
+    def test_author_change(self):
+        """ Тестирование счетчиков и кэша при смене автора поста """
+
+        post = Post.objects.create(text='test text', author=self.author)
+        with mock.patch('posts.signals.caching.bump') as bump:
+            post.author = self.reader
+            post.save()
+        self.assertEqual(self.profile(self.author).posts_count, 0)
+        self.assertEqual(self.profile(self.reader).posts_count, 1)
+        scopes = bump.call_args[0]
+        self.assertIn(f'author:{self.author.pk}', scopes)
+        self.assertIn(f'author:{self.reader.pk}', scopes)
+
+    def test_post_edit_is_atomic(self):
+        """ Тестирование отката счетчиков при сбое редактирования """
+
+        first = Group.objects.create(title='first', slug='first')
+        second = Group.objects.create(title='second', slug='second')
+        post = Post.objects.create(
+            text='test text', author=self.author, group=first
+        )
+        author_client = Client()
+        author_client.force_login(self.author)
+        with mock.patch('posts.signals.caching.bump',
+                        side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            author_client.post(
+                reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+                data={'text': 'edited', 'group': second.pk}
+            )
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.posts_count, second.posts_count), (1, 0))
+        self.assertEqual(Post.objects.get(pk=post.pk).group, first)
+
+    def test_form_render_outside_transaction(self):
+        """ Тестирование показа формы без транзакции """
+
+        enter = transaction.Atomic.__enter__
+        with mock.patch.object(transaction.Atomic, '__enter__',
+                               autospec=True, side_effect=enter) as atomic:
+            self.reader_client.get(reverse('posts:post_create'))
+        atomic.assert_not_called()
+
+    def test_feed_count_incremental(self):
+        """ Тестирование кэшированного числа постов лент """
+
+        cache.clear()
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text='test text', author=self.author)
+        timeline = TimelineEntry.objects.filter(user=self.reader)
+        self.assertEqual(feed_count('index', Post.objects.all()), 1)
+        scope = f'timeline:{self.reader.pk}'
+        self.assertEqual(feed_count(scope, timeline), 1)
+        post = Post.objects.create(text='test text', author=self.author)
+        with self.assertNumQueries(0):
+            self.assertEqual(feed_count('index', Post.objects.all()), 2)
+            self.assertEqual(feed_count(scope, timeline), 2)
+            self.assertEqual(feed_count(scope, timeline, limit=1), 1)
+        post.delete()
+        self.assertEqual(feed_count('index', Post.objects.all()), 1)
+        self.assertEqual(feed_count(scope, timeline), 1)
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(feed_count(scope, timeline), 0)
+
+    def test_paginator_uses_cached_count(self):
+        """ Тестирование окна страниц без COUNT(*) на прогретом кэше """
+
+        cache.clear()
+        Post.objects.bulk_create(
+            Post(text=f'test text {i}', author=self.author)
+            for i in range(0, 35)
+        )
+        response = self.client.get(reverse('posts:index'))
+        response = self.client.get(
+            reverse('posts:index'),
+            {'cursor': response.context['page_obj'].next_cursor}
+        )
+        self.assertEqual(response.context['page_obj'].page_window,
+                         [1, 2, 3, 4])
+        self.assertContains(response, 'page=3')
+        with self.assertNumQueries(1):
+            self.client.get(reverse('posts:index'), {'page': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import json
+import unittest
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.tests.on_commit import run_on_commit
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class TestFeeds(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test',
+            description='test desc'
+        )
+        for i in range(3):
+            Post.objects.create(
+                text=f'test text {i} <b>&</b>', author=cls.author,
+                group=cls.group if i else None
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def body(self, response):
+        if not response.streaming:
+            # Из кэша фид отдается целиком.
+            return response.content.decode()
+        return b''.join(response.streaming_content).decode()
+
+    def test_formats(self):
+        """ Тестирование RSS, Atom и JSON Feed для всех лент """
+
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        urls = {
+            reverse('posts:index_feed', args=('rss',)): expected,
+            reverse('posts:group_feed', args=('test', 'rss')): expected[:2],
+            reverse('posts:author_feed',
+                    args=('HasNoName', 'rss')): expected,
+        }
+        for url, posts in urls.items():
+            with self.subTest(value=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                channel = ElementTree.fromstring(self.body(response))[0]
+                self.assertEqual(
+                    [item.find('description').text
+                     for item in channel.iter('item')],
+                    [post.text for post in posts]
+                )
+        atom = ElementTree.fromstring(self.body(
+            self.client.get(reverse('posts:index_feed', args=('atom',)))
+        ))
+        self.assertEqual(len(atom.findall(f'{ATOM}entry')), 3)
+        feed = json.loads(self.body(
+            self.client.get(reverse('posts:index_feed', args=('json',)))
+        ))
+        self.assertEqual(
+            [item['content_text'] for item in feed['items']],
+            [post.text for post in expected]
+        )
+        self.assertEqual(
+            self.client.get(reverse('posts:index_feed', args=('txt',)))
+            .status_code, 404
+        )
+
+    def test_cache_and_conditional_get(self):
+        """ Тестирование кэша тела фида и ответа 304 """
+
+        url = reverse('posts:group_feed', args=('test', 'atom'))
+        first = self.client.get(url)
+        body = self.body(first)
+        self.assertIn('public', first['Cache-Control'])
+        with self.assertNumQueries(2):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content.decode(), body)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        with run_on_commit():
+            Post.objects.create(
+                text='fresh', author=self.author, group=self.group
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('fresh', self.body(response))
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'mirror.example'])
+    def test_cache_per_host(self):
+        """ Тестирование отдельного кэша фида для каждого хоста """
+
+        url = reverse('posts:index_feed', args=('rss',))
+        self.assertIn('http://testserver/', self.body(self.client.get(url)))
+        mirror = self.client.get(url, HTTP_HOST='mirror.example', secure=True)
+        body = self.body(mirror)
+        self.assertIn('https://mirror.example/', body)
+        self.assertNotIn('testserver', body)
+
+    def test_cache_ignores_query_string(self):
+        """ Тестирование фида без параметров запроса первого клиента """
+
+        url = reverse('posts:index_feed', args=('rss',))
+        tagged = self.body(self.client.get(url, {'utm_source': 'x'}))
+        self.assertIn(f'http://testserver{url}', tagged)
+        self.assertNotIn('utm_source', tagged)
+        self.assertNotIn('utm_source', self.body(self.client.get(url)))
+
+    def test_empty_feed(self):
+        """ Тестирование фида без записей """
+
+        Group.objects.create(title='empty', slug='empty', description='-')
+        url = reverse('posts:group_feed', args=('empty', 'rss'))
+        channel = ElementTree.fromstring(self.body(self.client.get(url)))[0]
+        self.assertEqual(list(channel.iter('item')), [])
+        self.assertEqual(
+            self.client.get(reverse('posts:group_feed', args=('no', 'rss')))
+            .status_code, 404
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import re
+import unittest
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.tests.on_commit import run_on_commit
+
+from ..caching import post_card_keys
+from ..models import Comment, Follow, Post, User
+from ..templatetags.fragments import CSRF_PLACEHOLDER
+
+
+class TestFragments(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Writer')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.other = User.objects.create_user(username='Other')
+        cls.post = Post.objects.create(text='test text', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.other_client = Client()
+        self.other_client.force_login(self.other)
+
+    def test_follow_button_per_user(self):
+        """ Тестирование кнопки подписки в кэше каждого пользователя """
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        url = reverse('posts:profile', args=(self.author.username,))
+        self.assertContains(self.reader_client.get(url), 'Отписаться')
+        self.assertContains(self.other_client.get(url), 'Подписаться')
+        with run_on_commit():
+            self.other_client.get(
+                reverse('posts:profile_follow', args=(self.author.username,))
+            )
+        self.assertContains(self.other_client.get(url), 'Отписаться')
+        self.assertContains(self.reader_client.get(url), 'Отписаться')
+
+    def test_follow_button_skips_query(self):
+        """ Тестирование отсутствия запроса подписки при попадании в кэш """
+
+        url = reverse('posts:profile', args=(self.author.username,))
+        # Единственный пост не заполняет страницу, но по счетчику постов
+        # автора видно, что в архиве их нет: архив не читается.
+        with self.assertNumQueries(7):
+            self.reader_client.get(url)
+        with self.assertNumQueries(5):
+            self.reader_client.get(url, {'page': 1})
+
+    def test_cached_comment_form_gets_fresh_csrf(self):
+        """ Тестирование подстановки CSRF-токена в кэшированную форму """
+
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        for client in (self.reader_client, self.other_client) * 2:
+            client.handler.enforce_csrf_checks = True
+            response = client.get(url)
+            self.assertNotContains(response, CSRF_PLACEHOLDER)
+            token = re.search(
+                r'name="csrfmiddlewaretoken" value="([^"]+)"',
+                response.content.decode()
+            ).group(1)
+            response = client.post(
+                reverse('posts:add_comment', args=(self.post.pk,)),
+                {'text': 'comment', 'csrfmiddlewaretoken': token}
+            )
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(Comment.objects.count(), 4)
+
+    def test_post_cards_shared_between_users(self):
+        """ Тестирование общих карточек постов в лентах подписок """
+
+        for user in (self.reader, self.other):
+            Follow.objects.create(user=user, author=self.author)
+        self.reader_client.get(reverse('posts:follow_index'))
+        key, = post_card_keys([self.post])
+        self.assertIn('test text', cache.get(key))
+        cache.set(key, 'shared card')
+        response = self.other_client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'shared card')
+        with run_on_commit():
+            Comment.objects.create(
+                post=self.post, author=self.other, text='c'
+            )
+        response = self.other_client.get(reverse('posts:follow_index'))
+        self.assertNotContains(response, 'shared card')
+        self.assertContains(response, 'test text')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class TestIndexes(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.reader = User.objects.create_user(username='HasName')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test',
+            description='test desc'
+        )
+        Post.objects.create(text='test', author=cls.author, group=cls.group)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_explain_feeds(self):
+        """ Тестирование планов запросов лент """
+
+        out = StringIO()
+        call_command('explain_feeds', stdout=out)
+        plans = out.getvalue()
+        for view in ('index', 'group_posts', 'profile', 'follow_index',
+                     'post_detail'):
+            with self.subTest(value=view):
+                self.assertIn(view, plans)
+        self.assertIn('post_date_id_idx', plans)
+        follow_plan = plans.split('follow_index')[1]
+        follow_plan = follow_plan.split('follow_identify')[0]
+        self.assertIn('timeline_user_date_idx', follow_plan)
+        self.assertNotIn('TEMP B-TREE', follow_plan)
+
+    def test_many_followers(self):
+        """ Тестирование нескольких подписчиков одного автора """
+
+        other = User.objects.create_user(username='test')
+        Follow.objects.create(user=other, author=self.author)
+        self.assertEqual(Follow.objects.filter(author=self.author).count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
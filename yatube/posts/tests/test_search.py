@@ -0,0 +1,102 @@
+import unittest
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from .. import search
+from ..models import Post
+
+User = get_user_model()
+
+
+class TestSearch(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        Post.objects.bulk_create([
+            Post(text=f'яблоко номер {i}', author=cls.author)
+            for i in range(0, 12)
+        ])
+        cls.pear = Post.objects.create(
+            text='<b>груша</b> и яблоко яблоко', author=cls.author
+        )
+
+    def get(self, **params):
+        return self.client.get(reverse('posts:search'), params)
+
+    def test_ranked_highlighted_results(self):
+        """ Тестирование ранжирования и подсветки """
+
+        response = self.get(q='яблок')
+        posts = response.context['page_obj'].object_list
+        self.assertEqual(len(posts), 10)
+        self.assertEqual(posts[0], self.pear)
+        self.assertIn('<mark>яблоко</mark>', posts[0].snippet)
+        self.assertIn('&lt;b&gt;', posts[0].snippet)
+        self.assertContains(response, 'cursor=')
+
+    def test_cursor_pages(self):
+        """ Тестирование курсоров в выдаче """
+
+        first = self.get(q='яблоко').context['page_obj']
+        second = self.get(q='яблоко', cursor=first.next_cursor)
+        second = second.context['page_obj']
+        self.assertEqual(len(second.object_list), 3)
+        self.assertFalse(
+            set(first.object_list) & set(second.object_list)
+        )
+        back = self.get(q='яблоко', cursor=second.previous_cursor)
+        self.assertEqual(
+            back.context['page_obj'].object_list, first.object_list
+        )
+        self.assertIsNone(second.last_cursor)
+        last = self.get(q='яблоко', cursor=first.last_cursor)
+        last = last.context['page_obj']
+        self.assertEqual(last.object_list, second.object_list)
+        self.assertEqual(last.number, 2)
+        self.assertEqual(last.page_window, [])
+
+    def test_index_follows_changes(self):
+        """ Тестирование синхронизации индекса с таблицей постов """
+
+        Post.objects.filter(pk=self.pear.pk).update(text='слива')
+        self.assertEqual(
+            self.get(q='груша').context['page_obj'].object_list, []
+        )
+        self.assertEqual(
+            self.get(q='слива').context['page_obj'].object_list,
+            [self.pear]
+        )
+        Post.objects.filter(pk=self.pear.pk).delete()
+        self.assertEqual(
+            self.get(q='слива').context['page_obj'].object_list, []
+        )
+
+    def test_syntax_is_escaped(self):
+        """ Тестирование спецсимволов FTS5 в запросе """
+
+        for query in ('"', 'AND OR', '*', 'NEAR(', ''):
+            with self.subTest(value=query):
+                self.assertEqual(self.get(q=query).status_code, 200)
+
+    def test_admin_search(self):
+        """ Тестирование поиска в админке """
+
+        admin = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, _ = admin.get_search_results(
+            request, Post.objects.all(), 'груш'
+        )
+        self.assertEqual(list(queryset), [self.pear])
+        queryset, _ = admin.get_search_results(
+            request, Post.objects.all(), 'яблок'
+        )
+        self.assertEqual(queryset.count(), 13)
+        self.assertTrue(search.is_supported())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import shutil
+import tempfile
+import unittest
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from PIL import Image
+
+from .. import variants
+from ..models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def uploaded(name='small.gif'):
+    return SimpleUploadedFile(
+        name=name,
+        content=SMALL_GIF,
+        content_type='image/gif'
+    )
+
+
+def tearDownModule():
+    shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=True)
+class TestThumbnails(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_thumbnail_on_create_and_edit(self):
+        """ Тестирование построения превью при создании и правке поста """
+
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'test post', 'image': uploaded()}
+        )
+        post = Post.objects.get()
+        self.assertTrue(post.thumbnail)
+        self.assertTrue(post.image_variants)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, json.loads(post.image_variants)['src'])
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'test post', 'image': uploaded('other.gif')}
+        )
+        edited = Post.objects.get()
+        self.assertTrue(edited.thumbnail)
+        self.assertNotEqual(edited.thumbnail, post.thumbnail)
+
+    def test_responsive_variants(self):
+        """ Тестирование вариантов картинки для srcset """
+
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 600), (200, 10, 10)).save(buffer, 'PNG')
+        post = Post.objects.create(
+            text='big',
+            author=self.author,
+            image=SimpleUploadedFile('big.png', buffer.getvalue())
+        )
+        picture = json.loads(variants.build(post.image))
+        self.assertEqual(picture['width'], 960)
+        self.assertTrue(picture['src'].endswith('-960.jpg'))
+        self.assertEqual(picture['srcset'].count('w,'), 2)
+        self.assertEqual(
+            [source['type'] for source in picture['sources']],
+            [mime for _, mime, _, _ in variants.supported_formats()
+             if mime != 'image/jpeg']
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestThumbnailCommand(TransactionTestCase):
+    def test_generate_thumbnails(self):
+        """ Тестирование команды generate_thumbnails """
+
+        author = User.objects.create_user(username='HasNoName')
+        for i in range(0, 3):
+            Post.objects.create(
+                text='test text', author=author, image=uploaded()
+            )
+        Post.objects.create(text='no image', author=author)
+        call_command('generate_thumbnails', workers=1, stdout=StringIO())
+        self.assertFalse(
+            Post.objects.exclude(image='').filter(thumbnail='').exists()
+        )
+        self.assertFalse(Post.objects.get(image='').thumbnail)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .. import timeline
+from ..counters import feed_count
+from ..models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TestTimeline(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.reader = User.objects.create_user(username='HasName')
+        for i in range(0, 3):
+            Post.objects.create(text='test text' + str(i), author=cls.author)
+
+    def entries(self):
+        return TimelineEntry.objects.filter(user=self.reader)
+
+    def test_follow_fan_out_unfollow(self):
+        """ Тестирование заполнения и очистки ленты подписок """
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.entries().count(), 3)
+        post = Post.objects.create(text='new', author=self.author)
+        self.assertTrue(self.entries().filter(post=post).exists())
+        Follow.objects.filter(user=self.reader, author=self.author).delete()
+        self.assertFalse(self.entries().exists())
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_length_is_capped(self):
+        """ Тестирование ограничения длины ленты """
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text='new', author=self.author)
+        self.assertEqual(
+            list(self.entries().order_by('-pub_date')
+                 .values_list('post', flat=True)),
+            list(Post.objects.values_list('pk', flat=True)[:2])
+        )
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_trim_each_user(self):
+        """ Тестирование обрезки нескольких лент независимо друг от друга """
+
+        other = User.objects.create_user(username='Other')
+        posts = list(Post.objects.order_by('-pub_date', '-pk'))
+        for user in (self.reader, other):
+            TimelineEntry.objects.bulk_create(
+                TimelineEntry(user=user, post=post, pub_date=post.pub_date)
+                for post in posts
+            )
+        TimelineEntry.objects.filter(user=other, post=posts[0]).delete()
+        with CaptureQueriesContext(connection) as queries:
+            timeline.trim([self.reader.pk, other.pk])
+        # Лишние записи всех лент и одно удаление, без JOIN с постами.
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn('JOIN', query['sql'])
+        self.assertEqual(
+            [entry.post for entry in self.entries().order_by('-pub_date')],
+            posts[:2]
+        )
+        self.assertEqual(
+            [entry.post for entry in TimelineEntry.objects.filter(
+                user=other).order_by('-pub_date')],
+            posts[1:]
+        )
+
+    def test_fan_out_counts_inserted(self):
+        """ Тестирование счетчика ленты при повторной раскладке поста """
+
+        cache.clear()
+        Follow.objects.create(user=self.reader, author=self.author)
+        scope = f'timeline:{self.reader.pk}'
+        self.assertEqual(feed_count(scope, self.entries()), 3)
+        post = Post.objects.create(text='new', author=self.author)
+        self.assertEqual(feed_count(scope, self.entries()), 4)
+        timeline.fan_out(post)
+        self.assertEqual(self.entries().count(), 4)
+        self.assertEqual(feed_count(scope, self.entries()), 4)
+
+    def test_rebuild_command(self):
+        """ Тестирование команды rebuild_timelines """
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.entries().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.entries().count(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
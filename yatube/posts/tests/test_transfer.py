@@ -0,0 +1,126 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import archive, transfer
+from ..models import Comment, Follow, Group, Post, Profile, TimelineEntry
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def tearDownModule():
+    shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TestTransfer(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        cls.reader = User.objects.create_user(username='HasName')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test',
+            description='test desc'
+        )
+        for i in range(5):
+            post = Post.objects.create(
+                text=f'test text {i}', author=cls.author,
+                group=cls.group if i % 2 else None
+            )
+            for j in range(i):
+                Comment.objects.create(
+                    post=post, author=cls.reader, text=f'comment {i}.{j}'
+                )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def snapshot(self):
+        return (
+            list(Post.objects.order_by('pub_date').values_list(
+                'text', 'pub_date', 'author__username', 'group__slug',
+                'comments_count'
+            )),
+            sorted(Comment.objects.values_list(
+                'post__text', 'author__username', 'text', 'created'
+            )),
+            list(Follow.objects.values_list(
+                'user__username', 'author__username'
+            )),
+        )
+
+    def roundtrip(self, fmt):
+        before = self.snapshot()
+        stream = io.StringIO()
+        count = transfer.WRITERS[fmt](transfer.export_rows(chunk_size=2),
+                                      stream)
+        self.assertEqual(count, 1 + 5 + 10 + 1)
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+        Follow.objects.all().delete()
+        stream.seek(0)
+        importer = transfer.Importer(batch_size=2)
+        counts = importer.load(transfer.READERS[fmt](stream))
+        self.assertEqual(
+            counts, {'group': 1, 'post': 5, 'comment': 10, 'follow': 1}
+        )
+        self.assertEqual(self.snapshot(), before)
+        profile = Profile.objects.get(user=self.author)
+        self.assertEqual(
+            (profile.posts_count, profile.followers_count), (5, 1)
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 5
+        )
+
+    def test_jsonl_roundtrip(self):
+        """ Тестирование выгрузки и загрузки в JSON Lines """
+
+        self.roundtrip('jsonl')
+
+    def test_csv_roundtrip(self):
+        """ Тестирование выгрузки и загрузки в CSV """
+
+        self.roundtrip('csv')
+
+    def test_export_includes_archive(self):
+        """ Тестирование выгрузки архивных постов и комментариев """
+
+        archive.archive_batch(timezone.now(), batch_size=3)
+        self.assertEqual(Post.objects.count(), 2)
+        rows = list(transfer.export_rows(chunk_size=2))
+        posts = [row for row in rows if row['model'] == 'post']
+        comments = [row for row in rows if row['model'] == 'comment']
+        self.assertEqual(
+            sorted(row['text'] for row in posts),
+            [f'test text {i}' for i in range(5)]
+        )
+        self.assertEqual(len(comments), 10)
+
+    def test_copy_media(self):
+        """ Тестирование копирования картинок """
+
+        post = Post.objects.first()
+        post.image = SimpleUploadedFile('pic.gif', b'GIF89a')
+        post.save()
+        target = tempfile.mkdtemp(dir=TEMP_MEDIA_ROOT)
+        rows = list(transfer.copy_media(transfer.export_rows(), target))
+        self.assertTrue(os.path.exists(os.path.join(target, post.image.name)))
+        Post.objects.all().delete()
+        os.remove(post.image.path)
+        transfer.Importer(media_dir=target).load(iter(rows))
+        imported = Post.objects.exclude(image='').get()
+        self.assertTrue(os.path.exists(imported.image.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from ..models import Comment, Follow, Post, TimelineEntry
+from ..utils import CursorPaginator, decode_cursor
+
+User = get_user_model()
+
+
+class TestCursorPaginator(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='HasNoName')
+        for i in range(0, 25):
+            Post.objects.create(text='test text' + str(i), author=cls.author)
+        cls.expected = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        self.paginator = CursorPaginator(Post.objects.all(), 10)
+
+    def test_walk_forward_and_back(self):
+        """ Тестирование перехода по курсорам вперед и назад """
+
+        first = self.paginator.cursor_page()
+        second = self.paginator.cursor_page(first.next_cursor)
+        third = self.paginator.cursor_page(second.next_cursor)
+        self.assertEqual(first.object_list, self.expected[:10])
+        self.assertEqual(second.object_list, self.expected[10:20])
+        self.assertEqual(third.object_list, self.expected[20:])
+        self.assertEqual(third.number, 3)
+        self.assertIsNone(third.next_cursor)
+        back = self.paginator.cursor_page(third.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[10:20])
+        self.assertEqual(back.number, 2)
+        self.assertIsNone(first.previous_cursor)
+
+    def test_no_count_query(self):
+        """ Тестирование отсутствия COUNT(*) при выборке страницы """
+
+        first = self.paginator.cursor_page()
+        with self.assertNumQueries(1):
+            self.paginator.cursor_page(first.next_cursor)
+
+    def test_offset_fallback_and_last(self):
+        """ Тестирование старых ссылок ?page=N и последней страницы """
+
+        page = self.paginator.offset_page('2')
+        self.assertEqual(page.object_list, self.expected[10:20])
+        self.assertEqual(
+            self.paginator.cursor_page(page.next_cursor).object_list,
+            self.expected[20:]
+        )
+        last = self.paginator.offset_page('100')
+        self.assertEqual(last.object_list, self.expected[20:])
+        self.assertEqual(last.number, 3)
+        self.assertIsNone(last.next_cursor)
+        back = self.paginator.cursor_page(last.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[10:20])
+        self.assertEqual(back.number, 2)
+        first = self.paginator.cursor_page(back.previous_cursor)
+        self.assertEqual(first.object_list, self.expected[:10])
+        self.assertEqual(first.number, 1)
+
+    def test_broken_cursor(self):
+        """ Тестирование испорченного курсора """
+
+        self.assertIsNone(decode_cursor('broken'))
+        page = self.paginator.cursor_page('broken')
+        self.assertEqual(page.object_list, self.expected[:10])
+
+    def test_page_window(self):
+        """ Тестирование окна номеров страниц """
+
+        paginator = CursorPaginator(Post.objects.all(), 10, count=200)
+        self.assertEqual(paginator.page_window(7, True),
+                         [1, None, 5, 6, 7, 8, 9, None, 20])
+        self.assertEqual(paginator.page_window(1, True),
+                         [1, 2, 3, None, 20])
+        self.assertEqual(paginator.page_window(None, True), [])
+        self.assertEqual(self.paginator.page_window(1, True), [])
+        last = CursorPaginator(Post.objects.all(), 10, count=25).last_page()
+        self.assertEqual(last.number, 3)
+
+
+class TestAscendingCursorPaginator(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='Commenter')
+        post = Post.objects.create(text='test text', author=author)
+        for i in range(0, 7):
+            Comment.objects.create(post=post, author=author, text=str(i))
+        cls.expected = list(Comment.objects.order_by('created', 'pk'))
+
+    def test_walk_by_created(self):
+        """ Тестирование курсоров по created от старых к новым """
+
+        paginator = CursorPaginator(
+            Comment.objects.order_by('pk'), 3, key='created',
+            descending=False
+        )
+        first = paginator.cursor_page()
+        second = paginator.cursor_page(first.next_cursor)
+        third = paginator.cursor_page(second.next_cursor)
+        self.assertEqual(first.object_list, self.expected[:3])
+        self.assertEqual(second.object_list, self.expected[3:6])
+        self.assertEqual(third.object_list, self.expected[6:])
+        self.assertIsNone(third.next_cursor)
+        back = paginator.cursor_page(third.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[3:6])
+
+
+class TestTimelineCursorPaginator(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='HasNoName')
+        cls.reader = User.objects.create_user(username='HasName')
+        other = User.objects.create_user(username='Other')
+        for i in range(0, 7):
+            Post.objects.create(text='test text' + str(i), author=author)
+        Follow.objects.create(user=cls.reader, author=author)
+        Follow.objects.create(user=other, author=author)
+        # Порядок ленты задает дата записи, а не дата поста.
+        entries = TimelineEntry.objects.filter(user=cls.reader)
+        dates = list(entries.order_by('-pub_date', '-post')
+                     .values_list('pub_date', flat=True))
+        for entry, date in zip(entries.order_by('pub_date', 'post'), dates):
+            entries.filter(pk=entry.pk).update(pub_date=date)
+        cls.expected = [
+            entry.post for entry in entries.order_by('-pub_date', '-post')
+        ]
+
+    def test_walk_by_timeline_date(self):
+        """ Тестирование курсоров ленты подписок по дате записи """
+
+        paginator = CursorPaginator(
+            Post.objects.for_timeline(self.reader), 3,
+            key='timeline_date', tiebreaker='timeline_post'
+        )
+        first = paginator.cursor_page()
+        second = paginator.cursor_page(first.next_cursor)
+        third = paginator.cursor_page(second.next_cursor)
+        self.assertEqual(first.object_list, self.expected[:3])
+        self.assertEqual(second.object_list, self.expected[3:6])
+        self.assertEqual(third.object_list, self.expected[6:])
+        self.assertIsNone(third.next_cursor)
+        back = paginator.cursor_page(third.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[3:6])
+
+
+if __name__ == '__main__':
+    unittest.main()
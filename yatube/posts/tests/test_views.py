@@ -4,11 +4,11 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from ..forms import PostForm
-from ..models import Follow, Group, Post, User
+from ..models import Comment, Follow, Group, Post, User
 
 User = get_user_model()
 
@@ -196,6 +196,27 @@ class TestPostsViews(TestCase):
         form_field = response.context.get('page_obj').object_list
         self.assertNotIn(self.test_post, form_field)
 
+    def test_feed_query_budget(self):
+        """ Тестирование числа запросов на страницу ленты """
+
+        Follow.objects.create(user=self.tess, author=self.user)
+        # Для index и follow_index при пустом кэше добавляется COUNT(*)
+        # счетчика ленты (у index — по горячей и архивной таблицам), у
+        # групп и авторов счетчики в базе.
+        budgets = {
+            reverse('posts:index'): (self.client, 3),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}):
+                (self.client, 3),
+            reverse('posts:profile', kwargs={'username': self.user.username}):
+                (self.client, 3),
+            reverse('posts:follow_index'): (self.tester_client, 4),
+        }
+        for namespace, (client, queries) in budgets.items():
+            with self.subTest(value=namespace):
+                cache.clear()
+                with self.assertNumQueries(queries):
+                    client.get(namespace)
+
     def test_follow(self):
         self.tester_client.get(
             reverse('posts:profile_follow',
@@ -232,5 +253,61 @@ class TestPostsViews(TestCase):
                 Post.objects.all().delete()
 
 
+@override_settings(COMMENTS_AMOUNT=10)
+class TestPostComments(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Commentator')
+        cls.post = Post.objects.create(text='test text', author=cls.user)
+        for i in range(0, 25):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'comment {i}'
+            )
+        cls.expected = list(Comment.objects.order_by('created', 'pk'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_batch_oldest_and_newest(self):
+        """ Тестирование первой порции комментариев в обоих порядках """
+
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        comments = self.client.get(url).context['comments']
+        self.assertEqual(list(comments), self.expected[:10])
+        self.assertIsNotNone(comments.next_cursor)
+        comments = self.client.get(url, {'order': 'newest'}).context[
+            'comments'
+        ]
+        self.assertEqual(list(comments), self.expected[::-1][:10])
+
+    def test_fragment_walk(self):
+        """ Тестирование догрузки комментариев фрагментами """
+
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        fragment = reverse(
+            'posts:post_comments', kwargs={'post_id': self.post.pk}
+        )
+        cursor = self.client.get(url).context['comments'].next_cursor
+        seen = self.expected[:10]
+        while cursor:
+            response = self.client.get(fragment, {'cursor': cursor})
+            self.assertTemplateUsed(response, 'posts/includes/comments.html')
+            self.assertNotContains(response, '<html')
+            seen += list(response.context['comments'])
+            cursor = response.context['comments'].next_cursor
+        self.assertEqual(seen, self.expected)
+
+    def test_fragment_query_budget(self):
+        """ Тестирование числа запросов фрагмента комментариев """
+
+        fragment = reverse(
+            'posts:post_comments', kwargs={'post_id': self.post.pk}
+        )
+        self.client.get(fragment)
+        with self.assertNumQueries(3):
+            self.client.get(fragment)
+
+
 if __name__ == '__main__':
     unittest.main()
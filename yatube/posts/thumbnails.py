@@ -0,0 +1,45 @@
+from sorl.thumbnail import get_thumbnail
+
+from core import jobs
+
+from . import caching, variants
+from .models import Post
+
+GEOMETRY = '960x339'
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def generate(post_id):
+    """Строит превью и адаптивные варианты, сохраняет их в посте.
+
+    Адрес записывается только если картинка не сменилась, пока
+    строилось превью.
+    """
+
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'author', 'group'
+    ).first()
+    if post is None or not post.image:
+        return None
+    thumbnail = get_thumbnail(post.image, GEOMETRY, **OPTIONS)
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail=thumbnail.url,
+        image_variants=variants.build(post.image)
+    )
+    if updated:
+        caching.bump(*caching.post_scopes(post))
+    return thumbnail.url
+
+
+def schedule(post):
+    """Ставит построение превью в очередь ``core.jobs``.
+
+    Ключ включает имя файла: повторная постановка той же картинки не
+    создает задачу, новая картинка — создает.
+    """
+
+    if not post.image:
+        return
+    jobs.enqueue(
+        'posts.thumbnail', post.pk, key=f'thumbnail:{post.pk}:{post.image}'
+    )
@@ -0,0 +1,170 @@
+from heapq import merge
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from . import counters
+from .models import ArchivedPost, Follow, Post, TimelineEntry, User
+
+PAGE_MIN = 20
+# Пользователей на один DELETE: по 5 параметров, не больше 999.
+TRIM_BATCH = 150
+
+
+def count_scopes(users):
+    """Ключи счетчиков ``counters.feed_count`` для лент пользователей."""
+
+    return [f'timeline:{getattr(user, "pk", user)}' for user in users]
+
+
+def trim(users):
+    """Обрезает ленты до ``TIMELINE_LENGTH`` самых свежих записей.
+
+    Первая лишняя запись каждой ленты ищется одним запросом: для
+    пользователя это OFFSET по индексу (user, -pub_date, -post), без
+    сортировки. Удаляются записи только переполненных лент, одним
+    DELETE на пачку пользователей — коррелированный подзапрос в DELETE
+    SQLite вычисляла бы заново для каждой строки лент.
+    """
+
+    length = settings.TIMELINE_LENGTH
+    users = list(users)
+    for start in range(0, len(users), TRIM_BATCH):
+        first_excess = TimelineEntry.objects.filter(
+            user=OuterRef('pk')
+        ).order_by('-pub_date', '-post_id')[length:length + 1]
+        excess = User.objects.filter(
+            pk__in=users[start:start + TRIM_BATCH]
+        ).annotate(
+            excess_date=Subquery(first_excess.values('pub_date')),
+            excess_post=Subquery(first_excess.values('post_id')),
+        ).filter(excess_date__isnull=False).values_list(
+            'pk', 'excess_date', 'excess_post'
+        )
+        condition = Q()
+        for user, pub_date, post in excess:
+            condition |= Q(user=user) & (
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, post__lte=post)
+            )
+        if condition:
+            TimelineEntry.objects.filter(condition).delete()
+
+
+@transaction.atomic
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора.
+
+    Счетчики сдвигаются только для лент, куда запись действительно
+    добавлена: пост мог попасть в ленту раньше через ``backfill``.
+    """
+
+    followers = list(
+        Follow.objects.filter(author=post.author_id)
+        .values_list('user', flat=True)
+    )
+    if not followers:
+        return
+    present = set(
+        TimelineEntry.objects.filter(post=post)
+        .values_list('user', flat=True)
+    )
+    added = [user for user in followers if user not in present]
+    if not added:
+        return
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user, post=post, pub_date=post.pub_date)
+         for user in added],
+        ignore_conflicts=True
+    )
+    trim(added)
+    counters.change_feed_count(count_scopes(added), 1)
+
+
+def forget(post):
+    """Сбрасывает счетчики лент, из которых каскадно ушел пост."""
+
+    counters.reset_feed_count(count_scopes(
+        Follow.objects.filter(author=post.author_id)
+        .values_list('user', flat=True)
+    ))
+
+
+@transaction.atomic
+def backfill(user, author):
+    """Добавляет в ленту последние посты автора после подписки.
+
+    Если горячих постов меньше ``TIMELINE_LENGTH``, лента дополняется
+    архивными.
+    """
+
+    length = settings.TIMELINE_LENGTH
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user, post_id=pk, pub_date=pub_date)
+         for pub_date, pk in islice(_newest(author, length), length)],
+        ignore_conflicts=True
+    )
+    trim([user])
+    counters.reset_feed_count(count_scopes([user]))
+
+
+def prune(user, author):
+    """Убирает из ленты посты автора после отписки."""
+
+    entries = TimelineEntry.objects.filter(user=user)
+    entries.filter(post__author=author).delete()
+    entries.filter(post__in=ArchivedPost.objects.filter(
+        author=author
+    ).values('pk')).delete()
+    counters.reset_feed_count(count_scopes([user]))
+
+
+def _newest(author, page):
+    """Посты автора от новых к старым, страницами по индексу.
+
+    После горячих постов идут архивные: они всегда старше.
+    """
+
+    for model in (Post, ArchivedPost):
+        posts = (
+            model.objects.filter(author=author)
+            .order_by('-pub_date', '-pk')
+            .values_list('pub_date', 'pk')
+        )
+        rows = list(posts[:page])
+        while rows:
+            yield from rows
+            if len(rows) < page:
+                break
+            pub_date, pk = rows[-1]
+            rows = list(posts.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )[:page])
+
+
+@transaction.atomic
+def rebuild(user):
+    """Пересобирает ленту пользователя с нуля по его подпискам.
+
+    Свежие посты каждого автора читаются страницами по индексу
+    (author, -pub_date) и сливаются в Python, пока не наберется
+    ``TIMELINE_LENGTH``: общий ORDER BY по всем постам подписок
+    сортировал бы их целиком.
+    """
+
+    TimelineEntry.objects.filter(user=user).delete()
+    counters.reset_feed_count(count_scopes([user]))
+    authors = list(Follow.objects.filter(user=user).values_list(
+        'author', flat=True
+    ))
+    if not authors:
+        return
+    length = settings.TIMELINE_LENGTH
+    page = max(PAGE_MIN, -(-length // len(authors)))
+    newest = merge(*(_newest(author, page) for author in authors),
+                   reverse=True)
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user, post_id=pk, pub_date=pub_date)
+         for pub_date, pk in islice(newest, length)]
+    )
@@ -0,0 +1,311 @@
+"""Потоковый обмен группами, постами, комментариями и подписками.
+
+Формат — одна запись на строку (JSON Lines) или CSV с общим набором
+колонок; поле ``model`` говорит, что это за запись. Пользователи и
+группы ссылаются друг на друга по username и slug, посты — по id из
+исходной базы. Экспорт идет пачками по id: после каждой пачки постов
+выгружаются их комментарии, поэтому при импорте хватает ограниченного
+кэша соответствия старых id новым.
+"""
+import csv
+import json
+import os
+import shutil
+from collections import OrderedDict
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from . import caching, counters, timeline
+from .models import (ArchivedComment, ArchivedPost, Comment, Follow, Group,
+                     Post, User)
+from .seeding import explicit_dates, search_triggers_paused
+
+CHUNK_SIZE = 2000
+# Не больше 999 параметров в одном запросе SQLite.
+BATCH_SIZE = 500
+POST_CACHE_SIZE = 100_000
+COLUMNS = (
+    'model', 'id', 'slug', 'title', 'description', 'user', 'author',
+    'group', 'post', 'text', 'pub_date', 'created', 'image',
+    'comments_count',
+)
+
+
+def _date(value):
+    return value.isoformat()
+
+
+def _export_posts(posts_model, comments_model, chunk_size):
+    """Посты одной части (горячей или архива), за пачкой — комментарии."""
+
+    last = 0
+    while True:
+        posts = list(
+            posts_model.objects.filter(pk__gt=last).order_by('pk')
+            .values_list(
+                'pk', 'author__username', 'group__slug', 'text',
+                'pub_date', 'image', 'comments_count'
+            )[:chunk_size]
+        )
+        if not posts:
+            break
+        for pk, author, group, text, pub_date, image, comments in posts:
+            yield {
+                'model': 'post', 'id': pk, 'author': author,
+                'group': group, 'text': text, 'pub_date': _date(pub_date),
+                'image': image, 'comments_count': comments,
+            }
+        comments = comments_model.objects.filter(
+            post__gt=last, post__lte=posts[-1][0]
+        ).order_by('post', 'created').values_list(
+            'pk', 'post', 'author__username', 'text', 'created'
+        )
+        for pk, post, author, text, created in comments.iterator():
+            yield {
+                'model': 'comment', 'id': pk, 'post': post,
+                'author': author, 'text': text, 'created': _date(created),
+            }
+        last = posts[-1][0]
+
+
+def export_rows(chunk_size=CHUNK_SIZE):
+    """Записи для выгрузки; в памяти не больше одной пачки.
+
+    Архивные посты и комментарии выгружаются как обычные: id в архиве
+    те же, что были в горячих таблицах.
+    """
+
+    groups = Group.objects.order_by('pk').values(
+        'id', 'slug', 'title', 'description'
+    )
+    for group in groups.iterator(chunk_size=chunk_size):
+        yield {'model': 'group', **group}
+    yield from _export_posts(Post, Comment, chunk_size)
+    yield from _export_posts(ArchivedPost, ArchivedComment, chunk_size)
+    follows = Follow.objects.order_by('pk').values_list(
+        'user__username', 'author__username'
+    )
+    for user, author in follows.iterator(chunk_size=chunk_size):
+        yield {'model': 'follow', 'user': user, 'author': author}
+
+
+def write_jsonl(rows, stream):
+    count = 0
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def write_csv(rows, stream):
+    writer = csv.DictWriter(stream, COLUMNS, restval='')
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        yield {key: value for key, value in row.items() if value != ''}
+
+
+WRITERS = {'jsonl': write_jsonl, 'csv': write_csv}
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def guess_format(path):
+    return 'csv' if path.endswith('.csv') else 'jsonl'
+
+
+def copy_media(rows, target):
+    """Копирует файлы картинок выгружаемых постов в каталог ``target``."""
+
+    for row in rows:
+        if row['model'] == 'post' and row.get('image'):
+            source = default_storage.path(row['image'])
+            destination = os.path.join(target, row['image'])
+            if os.path.exists(source):
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.copyfile(source, destination)
+        yield row
+
+
+class Importer:
+    """Загружает записи пачками ``bulk_create``.
+
+    Пользователи, группы и посты ищутся через кэши, поэтому на каждую
+    пачку приходится несколько запросов, а не по запросу на строку.
+    Отсутствующие пользователи создаются без пароля.
+    """
+
+    def __init__(self, media_dir=None, batch_size=BATCH_SIZE):
+        self.media_dir = media_dir
+        self.batch_size = batch_size
+        self.users = {}
+        self.groups = {}
+        self.posts = OrderedDict()
+        self.pending_posts = set()
+        self.pending = {model: [] for model in
+                        ('group', 'post', 'comment', 'follow')}
+        self.touched_users = set()
+        self.followers = set()
+        self.counts = dict.fromkeys(self.pending, 0)
+        self.skipped = 0
+
+    def load(self, rows):
+        with search_triggers_paused(), explicit_dates(
+            Post._meta.get_field('pub_date'),
+            Comment._meta.get_field('created'),
+        ):
+            for row in rows:
+                model = row.get('model')
+                if model not in self.pending:
+                    self.skipped += 1
+                    continue
+                if (model == 'comment'
+                        and str(row['post']) in self.pending_posts):
+                    self.flush('post')
+                if model == 'post':
+                    self.pending_posts.add(str(row['id']))
+                self.pending[model].append(row)
+                if len(self.pending[model]) >= self.batch_size:
+                    self.flush(model)
+            for model in self.pending:
+                self.flush(model)
+        self.finish()
+        return self.counts
+
+    def flush(self, model):
+        rows = self.pending[model]
+        if not rows:
+            return
+        if model in ('post', 'comment') and self.pending['group']:
+            self.flush('group')
+        self.pending[model] = []
+        if model == 'post':
+            self.pending_posts.clear()
+        with transaction.atomic():
+            created = getattr(self, f'_import_{model}s')(rows)
+        self.counts[model] += created
+
+    def resolve_users(self, usernames):
+        missing = {name for name in usernames if name not in self.users}
+        if missing:
+            self.users.update(User.objects.filter(
+                username__in=missing
+            ).values_list('username', 'pk'))
+            new = [User(username=name, password='!')
+                   for name in missing if name not in self.users]
+            if new:
+                User.objects.bulk_create(new)
+                self.users.update(User.objects.filter(
+                    username__in=[user.username for user in new]
+                ).values_list('username', 'pk'))
+        return [self.users[name] for name in usernames]
+
+    def resolve_groups(self, slugs):
+        missing = {slug for slug in slugs
+                   if slug and slug not in self.groups}
+        if missing:
+            self.groups.update(Group.objects.filter(
+                slug__in=missing
+            ).values_list('slug', 'pk'))
+        return [self.groups.get(slug) if slug else None for slug in slugs]
+
+    def _import_groups(self, rows):
+        existing = set(Group.objects.filter(
+            slug__in=[row['slug'] for row in rows]
+        ).values_list('slug', flat=True))
+        new = [Group(slug=row['slug'], title=row['title'],
+                     description=row.get('description', ''))
+               for row in rows if row['slug'] not in existing]
+        Group.objects.bulk_create(new)
+        self.resolve_groups([row['slug'] for row in rows])
+        return len(new)
+
+    def _import_posts(self, rows):
+        authors = self.resolve_users([row['author'] for row in rows])
+        groups = self.resolve_groups([row.get('group') for row in rows])
+        last = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        last = last.first() or 0
+        Post.objects.bulk_create([
+            Post(author_id=author, group_id=group, text=row['text'],
+                 pub_date=parse_datetime(row['pub_date']),
+                 image=self._media(row.get('image')),
+                 comments_count=int(row.get('comments_count') or 0))
+            for row, author, group in zip(rows, authors, groups)
+        ])
+        new_ids = Post.objects.filter(pk__gt=last).order_by('pk')
+        for row, pk in zip(rows, new_ids.values_list('pk', flat=True)):
+            self.posts[str(row['id'])] = pk
+        while len(self.posts) > POST_CACHE_SIZE:
+            self.posts.popitem(last=False)
+        self.touched_users.update(authors)
+        return len(rows)
+
+    def _import_comments(self, rows):
+        authors = self.resolve_users([row['author'] for row in rows])
+        comments = []
+        for row, author in zip(rows, authors):
+            post = self.posts.get(str(row['post']))
+            if post is None:
+                self.skipped += 1
+                continue
+            comments.append(Comment(
+                post_id=post, author_id=author, text=row['text'],
+                created=parse_datetime(row['created'])
+            ))
+        Comment.objects.bulk_create(comments)
+        return len(comments)
+
+    def _import_follows(self, rows):
+        users = self.resolve_users([row['user'] for row in rows])
+        authors = self.resolve_users([row['author'] for row in rows])
+        follows = [Follow(user_id=user, author_id=author)
+                   for user, author in zip(users, authors)
+                   if user != author]
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        self.touched_users.update(users + authors)
+        self.followers.update(users)
+        return len(follows)
+
+    def _media(self, name):
+        if not name or not self.media_dir:
+            return name or ''
+        source = os.path.join(self.media_dir, name)
+        if not os.path.exists(source):
+            return name
+        with open(source, 'rb') as image:
+            return default_storage.save(name, File(image))
+
+    @transaction.atomic
+    def finish(self):
+        """Счетчики профилей и ленты: bulk_create обходит сигналы.
+
+        Одна транзакция на все ленты: иначе каждая пересборка
+        завершалась бы отдельным fsync.
+        """
+
+        users = sorted(self.touched_users)
+        for start in range(0, len(users), BATCH_SIZE):
+            counters.recount_profiles(User.objects.filter(
+                pk__in=users[start:start + BATCH_SIZE]
+            ))
+        for user in self.followers:
+            timeline.rebuild(user)
+        counters.recount_groups()
+        counters.reset_feed_count(['index'])
+        caching.bump(caching.GLOBAL_SCOPE)
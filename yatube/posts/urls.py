@@ -7,18 +7,28 @@ app_name = 'posts'
 urlpatterns = [
     path('',
          views.index, name='index'),
+    path('feed.<str:fmt>',
+         views.index_feed, name='index_feed'),
     path('group/<slug:slug>/',
          views.group_posts, name='group_list'),
+    path('group/<slug:slug>/feed.<str:fmt>',
+         views.group_feed, name='group_feed'),
     path('profile/<str:username>/',
          views.profile, name='profile'),
+    path('profile/<str:username>/feed.<str:fmt>',
+         views.author_feed, name='author_feed'),
     path('posts/<int:post_id>/',
          views.post_detail, name='post_detail'),
     path('create/',
          views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/',
          views.post_edit, name='post_edit'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments, name='post_comments'),
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
+    path('search/',
+         views.search, name='search'),
     path('follow/',
          views.follow_index, name='follow_index'),
     path(
@@ -1,8 +1,305 @@
+import base64
+import json
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import SimpleLazyObject
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'next'
+PREVIOUS = 'prev'
+LAST = 'last'
+
+
+def dump_token(payload):
+    """Упаковывает JSON-совместимое значение в непрозрачный токен."""
+
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def load_token(token):
+    """Обратное к dump_token; ValueError для испорченного токена."""
+
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    return json.loads(raw.decode())
+
+
+def encode_cursor(direction, obj=None, number=None, key='pub_date',
+                  tiebreaker='pk'):
+    """Упаковывает позицию ленты в непрозрачный токен."""
+
+    payload = [direction, number]
+    if obj is not None:
+        payload += [getattr(obj, key).isoformat(), getattr(obj, tiebreaker)]
+    return dump_token(payload)
+
+
+def decode_cursor(token):
+    """Возвращает (direction, дата, pk, number) или None."""
+
+    try:
+        payload = load_token(token)
+        direction, number = payload[:2]
+        if direction not in (NEXT, PREVIOUS, LAST):
+            return None
+        pub_date = pk = None
+        if direction != LAST:
+            pub_date = parse_datetime(payload[2])
+            pk = int(payload[3])
+            if pub_date is None:
+                return None
+        if number is not None:
+            number = int(number)
+    except (ValueError, TypeError, IndexError):
+        return None
+    return direction, pub_date, pk, number
+
+
+class CursorPaginator(Paginator):
+    """Keyset-паджинатор по паре (дата, id).
+
+    Страница выбирается условием на ключ вместо OFFSET, поэтому время
+    выборки не зависит от глубины. COUNT(*) выполняется только если
+    кто-то явно обратится к ``count``/``num_pages``. По умолчанию
+    ключ — ``pub_date`` от новых к старым; ``key`` и ``descending``
+    меняют поле даты и направление, ``tiebreaker`` — поле вместо
+    ``pk`` для строк с одинаковой датой.
+    """
+
+    key = 'pub_date'
+    tiebreaker = 'pk'
+    ordering = ('-pub_date', '-pk')
+    reverse_ordering = ('pub_date', 'pk')
+
+    def __init__(self, object_list, per_page, key=None, descending=True,
+                 count=None, tiebreaker=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # Заранее известное (кэшированное) число вместо COUNT(*).
+            self.count = count
+        if key is not None or tiebreaker is not None or not descending:
+            self.key = key or self.key
+            self.tiebreaker = tiebreaker or self.tiebreaker
+            forward = (self.key, self.tiebreaker)
+            backward = tuple(f'-{field}' for field in forward)
+            if descending:
+                forward, backward = backward, forward
+            self.ordering, self.reverse_ordering = forward, backward
+
+    def _beyond(self, value, pk, reverse=False):
+        """Условие «дальше позиции» в порядке ``ordering``."""
+
+        ordering = self.reverse_ordering if reverse else self.ordering
+        lookup = 'lt' if ordering[0].startswith('-') else 'gt'
+        return (
+            Q(**{f'{self.key}__{lookup}': value})
+            | Q(**{self.key: value, f'{self.tiebreaker}__{lookup}': pk})
+        )
+
+    def cursor_page(self, cursor=None):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self._build_page(self._fetch(seen=0), 1)
+        direction, value, pk, number = decoded
+        if direction == LAST:
+            return self.last_page()
+        if direction == NEXT:
+            seen = (number - 1) * self.per_page if number else None
+            rows = self._fetch(self._beyond(value, pk), seen=seen)
+            return self._build_page(rows, number, has_previous=True)
+        rows = self._fetch(self._beyond(value, pk, reverse=True),
+                           reverse=True)
+        has_previous = len(rows) > self.per_page
+        rows = list(reversed(rows[:self.per_page]))
+        if not has_previous:
+            number = 1
+        return self._build_page(
+            rows, number, has_previous=has_previous, has_next=True
+        )
+
+    def offset_page(self, number):
+        """Совместимость со старыми ссылками вида ``?page=N``."""
+
+        if number == 'last':
+            return self.last_page()
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        if number < 1:
+            number = 1
+        skip = skip_before = (number - 1) * self.per_page
+        limit = self.per_page + 1
+        rows = []
+        for index, queryset in enumerate(self._sources()):
+            if index and self._covered(skip_before, rows):
+                break
+            chunk = list(queryset.order_by(*self.ordering)[
+                skip:skip + limit - len(rows)
+            ])
+            rows += chunk
+            if len(rows) >= limit:
+                break
+            # В следующую часть пропускается остаток OFFSET.
+            skip = 0 if chunk or not skip else max(
+                skip - queryset.count(), 0
+            )
+        if not rows and number > 1:
+            return self.last_page()
+        return self._build_page(rows, number, has_previous=number > 1)
+
+    def last_page(self):
+        """Последняя страница в тех же границах, что и ``?page=N``.
+
+        На ней ``count - (num_pages - 1) * per_page`` объектов, поэтому
+        переход назад от нее дает те же страницы, что и вперед от
+        первой; ради этого число объектов считается, если неизвестно.
+        """
 
+        number = self.num_pages
+        size = self.count - (number - 1) * self.per_page or self.per_page
+        rows = self._fetch(reverse=True, limit=size + 1)
+        has_previous = len(rows) > size
+        rows = list(reversed(rows[:size]))
+        if not has_previous:
+            number = 1
+        return self._build_page(rows, number, has_previous=has_previous)
 
-def pagination(request, post_list):
-    paginator = Paginator(post_list, settings.POSTS_AMOUNT)
+    @property
+    def count_known(self):
+        """Известно ли число объектов без COUNT(*)."""
+
+        return 'count' in self.__dict__
+
+    def page_window(self, number, has_next, on_each_side=2, on_ends=1):
+        """Номера страниц вокруг ``number``; None — пропуск («…»).
+
+        Пустой список, если номер страницы или число объектов
+        неизвестны: ради окна COUNT(*) не выполняется.
+        """
+
+        if not number or not self.count_known:
+            return []
+        last = max(self.num_pages, number + 1 if has_next else number)
+        shown = set(range(1, min(on_ends, last) + 1))
+        shown.update(range(max(1, number - on_each_side),
+                           min(last, number + on_each_side) + 1))
+        shown.update(range(max(1, last - on_ends + 1), last + 1))
+        window = []
+        for page in sorted(shown):
+            if window and page - window[-1] > 1:
+                window.append(None)
+            window.append(page)
+        return window
+
+    def _sources(self, reverse=False):
+        """Части ленты по порядку: горячая таблица, затем архив.
+
+        Архивные посты старше горячих, поэтому следующая часть
+        читается, только если в предыдущей строк не хватило.
+        """
+
+        partitions = getattr(self.object_list, 'partitions', None)
+        if partitions is None:
+            return [self.object_list]
+        sources = [part for part in partitions() if part is not None]
+        return sources[::-1] if reverse else sources
+
+    def _covered(self, seen, rows):
+        """Выбраны ли уже все объекты ленты от начала до ``rows``.
+
+        ``seen`` — сколько объектов стоит перед страницей (None —
+        неизвестно). По известному числу объектов паджинатор не идет в
+        следующие части ленты (архив), когда строк там быть не может.
+        """
+
+        return (seen is not None and self.count_known
+                and seen + len(rows) >= self.count)
+
+    def _fetch(self, condition=None, reverse=False, seen=None, limit=None):
+        """Строки страницы из частей ленты по порядку.
+
+        ``seen`` — позиция страницы от начала ленты для ``_covered``,
+        ``limit`` — сколько строк выбрать (по умолчанию страница и еще
+        одна строка, чтобы узнать о следующей).
+        """
+
+        ordering = self.reverse_ordering if reverse else self.ordering
+        limit = limit or self.per_page + 1
+        rows = []
+        for index, queryset in enumerate(self._sources(reverse)):
+            if index and not reverse and self._covered(seen, rows):
+                break
+            if condition is not None:
+                queryset = queryset.filter(condition)
+            rows += queryset.order_by(*ordering)[:limit - len(rows)]
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def _build_page(self, rows, number, has_previous=False, has_next=None):
+        if has_next is None:
+            has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        page = Page(rows, number or 0, self)
+        page.next_cursor = None
+        page.previous_cursor = None
+        page.last_cursor = None
+        if rows and has_next:
+            page.next_cursor = encode_cursor(
+                NEXT, rows[-1], number + 1 if number else None, self.key,
+                self.tiebreaker
+            )
+            page.last_cursor = encode_cursor(LAST)
+        if rows and has_previous:
+            page.previous_cursor = encode_cursor(
+                PREVIOUS, rows[0], number - 1 if number else None,
+                self.key, self.tiebreaker
+            )
+        page.page_window = self.page_window(
+            page.number, page.next_cursor is not None
+        )
+        return page
+
+
+def pagination(request, post_list, count=None, **options):
+    """Страница ленты; ``count`` — кэшированное число постов для окна.
+
+    ``options`` (``key``, ``tiebreaker``) передаются паджинатору.
+    """
+
+    paginator = CursorPaginator(
+        post_list, settings.POSTS_AMOUNT, count=count, **options
+    )
     page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    if page_number is not None and 'cursor' not in request.GET:
+        return paginator.offset_page(page_number)
+    return paginator.cursor_page(request.GET.get('cursor'))
+
+
+def lazy_pagination(request, post_list, count=None, **options):
+    """Страница ленты, которая выбирается при первом обращении.
+
+    Для лент внутри ``{% cache %}``: при попадании во фрагмент шаблон
+    страницу не трогает, и запросов за постами нет. ``count`` может
+    быть функцией — тогда и число постов считается только по
+    обращению.
+    """
+
+    def page():
+        total = count() if callable(count) else count
+        return pagination(request, post_list, total, **options)
+
+    return SimpleLazyObject(page)
+
+
+def comments_page(request, comments):
+    """Страница комментариев: ``?order=newest`` — от новых к старым."""
+
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_AMOUNT, key='created',
+        descending=request.GET.get('order') == 'newest'
+    )
+    return paginator.cursor_page(request.GET.get('cursor'))
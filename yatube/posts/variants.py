@@ -0,0 +1,74 @@
+import json
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+WIDTHS = (480, 720, 960)
+RATIO = 339 / 960
+SIZES = '(max-width: 960px) 100vw, 960px'
+# Порядок важен: браузер берет первый поддерживаемый <source>.
+FORMATS = (
+    ('AVIF', 'image/avif', 'avif', {'quality': 60}),
+    ('WEBP', 'image/webp', 'webp', {'quality': 75, 'method': 4}),
+    ('JPEG', 'image/jpeg', 'jpg',
+     {'quality': 80, 'optimize': True, 'progressive': True}),
+)
+
+
+def supported_formats():
+    """Форматы, которые умеет сохранять установленный Pillow."""
+
+    Image.init()
+    return [fmt for fmt in FORMATS if fmt[0] in Image.SAVE]
+
+
+def _widths(image):
+    widths = [width for width in WIDTHS if width <= image.width]
+    return widths or WIDTHS[:1]
+
+
+def build(image_field, storage=default_storage):
+    """Строит кадрированные варианты картинки разной ширины и формата.
+
+    Возвращает JSON для ``Post.image_variants``: ``sources`` для
+    ``<source>`` и JPEG-запасной вариант в ``src``/``srcset``.
+    """
+
+    with image_field.open('rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    stem = os.path.splitext(os.path.basename(image_field.name))[0]
+    sources = []
+    fallback = None
+    for fmt, mime, extension, options in supported_formats():
+        candidates = []
+        for width in _widths(image):
+            size = (width, round(width * RATIO))
+            variant = ImageOps.fit(image, size, Image.LANCZOS)
+            if fmt == 'JPEG' or variant.mode not in ('RGB', 'RGBA'):
+                variant = variant.convert('RGB')
+            buffer = BytesIO()
+            variant.save(buffer, fmt, **options)
+            name = storage.save(
+                f'posts/variants/{stem}-{width}.{extension}',
+                ContentFile(buffer.getvalue())
+            )
+            candidates.append((width, storage.url(name)))
+        srcset = ', '.join(f'{url} {width}w' for width, url in candidates)
+        if fmt == 'JPEG':
+            fallback = {
+                'src': candidates[-1][1],
+                'srcset': srcset,
+                'width': candidates[-1][0],
+                'height': round(candidates[-1][0] * RATIO),
+            }
+        else:
+            sources.append({'type': mime, 'srcset': srcset})
+    return json.dumps(
+        {'sources': sources, 'sizes': SIZES, **fallback},
+        separators=(',', ':')
+    )
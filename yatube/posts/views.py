@@ -1,62 +1,145 @@
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
+
+from core import jobs
+from core.db.routers import replica_reads
 
+from . import thumbnails
+from .caching import feed_cache, fragment_version
+from .conditional import (author_feed_etag, group_etag, group_feed_etag,
+                          index_feed_etag, post_etag, profile_etag)
+from .counters import feed_count, get_profile
+from .feeds import FORMATS, feed_response
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
-from .utils import pagination
+from .models import (ArchivedPost, Follow, Group, Post, TimelineEntry,
+                     User)
+from .search import search_page
+from .utils import comments_page, lazy_pagination, pagination
 
 
+@replica_reads
 def index(request):
-    post_list = Post.objects.all()
-    page_obj = pagination(request, post_list)
+    post_list = Post.objects.for_feed().with_archive()
+    page_obj = lazy_pagination(
+        request, post_list,
+        partial(feed_count, 'index', Post.objects.all().with_archive())
+    )
     context = {
         'page_obj': page_obj,
         'index': True,
+        **feed_cache(request, 'index'),
     }
     return render(request, 'posts/index.html', context)
 
 
+@replica_reads
+@condition(etag_func=group_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
-    page_obj = pagination(request, posts)
+    posts = Post.objects.for_feed().filter(group=group).with_archive(
+        group=group
+    )
+    page_obj = lazy_pagination(request, posts, group.posts_count)
     context = {
         'page_obj': page_obj,
         'group': group,
+        **feed_cache(request, f'group:{group.pk}'),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+def search(request):
+    query, page_obj = search_page(request)
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+        'pagination_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@condition(etag_func=index_feed_etag)
+def index_feed(request, fmt):
+    if fmt not in FORMATS:
+        raise Http404
+    return feed_response(
+        request, fmt, 'index', 'Последние обновления на сайте',
+        reverse('posts:index'), Post.objects.all()
+    )
+
+
+@condition(etag_func=group_feed_etag)
+def group_feed(request, slug, fmt):
+    group = get_object_or_404(Group, slug=slug)
+    if fmt not in FORMATS:
+        raise Http404
+    return feed_response(
+        request, fmt, f'group:{group.pk}', f'Записи сообщества {group}',
+        reverse('posts:group_list', args=(slug,)), group.posts.all()
+    )
+
+
+@condition(etag_func=author_feed_etag)
+def author_feed(request, username, fmt):
+    author = get_object_or_404(User, username=username)
+    if fmt not in FORMATS:
+        raise Http404
+    return feed_response(
+        request, fmt, f'author:{author.pk}',
+        f'Записи пользователя {author.get_full_name() or author.username}',
+        reverse('posts:profile', args=(username,)), author.posts.all()
+    )
+
+
 @login_required
 def follow_identify(request, username):
     follow = get_object_or_404(User, username=username)
     return Follow.objects.filter(user=request.user, author=follow).exists()
 
 
+@replica_reads
+@condition(etag_func=profile_etag)
 def profile(request, username):
-    name = get_object_or_404(User, username=username)
+    name = get_object_or_404(
+        User.objects.select_related('profile'), username=username
+    )
     full_name = name.get_full_name()
-    posts = Post.objects.filter(author=name)
-    posts_number = posts.count()
-    page_obj = pagination(request, posts)
+    posts = Post.objects.for_feed().filter(author=name).with_archive(
+        author=name
+    )
+    counters = get_profile(name)
+    page_obj = lazy_pagination(request, posts, counters.posts_count)
     author = name
-    following = follow_identify(request, username)
+    # Вычисляется шаблоном, только если кнопки подписки нет в кэше.
+    following = partial(follow_identify, request, username)
     context = {
         'full_name': full_name,
         'page_obj': page_obj,
-        'posts_number': posts_number,
+        'posts_number': counters.posts_count,
+        'counters': counters,
         'author': author,
-        'following': following
+        'following': following,
+        'follow_version': fragment_version(f'followers:{author.pk}'),
+        **feed_cache(request, f'author:{author.pk}'),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@replica_reads
+@condition(etag_func=post_etag)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = hot_or_archived(post_id, 'author__profile', 'group')
     comment_form = CommentForm()
-    comments = Comment.objects.filter(post=post_id)
     author = post.author
-    posts_number = (Post.objects.filter(author=author)).count()
+    posts_number = get_profile(author).posts_count
     title = post.text[:30]
     context = {
         'post': post,
@@ -64,11 +147,45 @@ def post_detail(request, post_id):
         'title': title,
         'posts_number': posts_number,
         'form': comment_form,
-        'comments': comments
+        'archived': isinstance(post, ArchivedPost),
+        **comments_context(request, post),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def hot_or_archived(post_id, *related):
+    """Пост из горячей таблицы, а если он уже перенесен — из архива."""
+
+    for posts in (Post.objects, ArchivedPost.objects):
+        post = posts.select_related(*related).filter(pk=post_id).first()
+        if post is not None:
+            return post
+    raise Http404
+
+
+def comments_context(request, post):
+    comments = post.comments.select_related(
+        'author'
+    ).only('text', 'created', 'post_id', 'author__username').order_by(
+        'created', 'pk'
+    )
+    order = 'newest' if request.GET.get('order') == 'newest' else 'oldest'
+    return {
+        'comments': comments_page(request, comments),
+        'comments_order': order,
+    }
+
+
+@replica_reads
+@condition(etag_func=post_etag)
+def post_comments(request, post_id):
+    """Следующая порция комментариев без остальной страницы поста."""
+
+    post = hot_or_archived(post_id)
+    context = {'post': post, **comments_context(request, post)}
+    return render(request, 'posts/includes/comments.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None,
@@ -76,10 +193,13 @@ def post_create(request):
                     )
     if request.method == 'POST':
         if form.is_valid():
-            author = request.user
-            result = form.save(commit=False)
-            result.author = author
-            result.save()
+            # Транзакция только на запись: показ формы не берет блокировку.
+            with transaction.atomic():
+                author = request.user
+                result = form.save(commit=False)
+                result.author = author
+                result.save()
+                thumbnails.schedule(result)
             return redirect('posts:profile', username=request.user)
         return render(request, 'posts/create_post.html', {'form': form})
     return render(request, 'posts/create_post.html', {'form': form})
@@ -94,7 +214,13 @@ def post_edit(request, post_id):
                         files=request.FILES or None,
                         instance=post)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                if 'image' in form.changed_data:
+                    post.thumbnail = ''
+                    post.image_variants = ''
+                form.save()
+                if 'image' in form.changed_data:
+                    thumbnails.schedule(post)
             return (
                 redirect('posts:post_detail', post_id))
         return render(request,
@@ -110,17 +236,30 @@ def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
-        comment = form.save(commit=False)
-        comment.author = request.user
-        comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment = form.save(commit=False)
+            comment.author = request.user
+            comment.post = post
+            comment.save()
+            jobs.enqueue(
+                'posts.comment_email', comment.pk,
+                key=f'comment-email:{comment.pk}'
+            )
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@replica_reads
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = pagination(request, posts)
+    posts = Post.objects.for_timeline(request.user)
+    count = feed_count(
+        f'timeline:{request.user.pk}',
+        TimelineEntry.objects.filter(user=request.user),
+        settings.TIMELINE_LENGTH
+    )
+    page_obj = pagination(
+        request, posts, count, key='timeline_date', tiebreaker='timeline_post'
+    )
     context = {
         'page_obj': page_obj,
         'follow': True
@@ -129,6 +268,7 @@ def follow_index(request):
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     follow = get_object_or_404(User, username=username)
     if request.user.id != follow.id:
@@ -137,6 +277,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     follow = get_object_or_404(User, username=username)
     if request.user.id != follow.id:
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.performance.PerformanceMiddleware',
+    'core.middleware.replicas.PrimaryPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,6 +83,10 @@ TEMPLATES = [
     },
 ]
 
+# Разобрать все шаблоны при старте; имеет смысл с кэширующим
+# загрузчиком, см. yatube/settings_production.py.
+TEMPLATE_WARMUP = False
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -92,6 +99,21 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
+# Реплики для чтения лент, копии default:
+# SQLITE_REPLICAS=/data/replica1.sqlite3,/data/replica2.sqlite3
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+        filter(None, os.getenv('SQLITE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['core.db.routers.ReplicaRouter']
+# Граница отставания реплик: столько секунд после записи клиент читает
+# с основной базы, и столько живут фрагменты кэша, собранные по реплике.
+REPLICA_PIN_SECONDS = 10
 
 
 # Password validation
@@ -133,10 +155,36 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 POSTS_AMOUNT = 10
+COMMENTS_AMOUNT = 20
+TIMELINE_LENGTH = 1000
+FEED_CACHE_TIMEOUT = 60 * 60
+# Кэшированное число постов ленты пересчитывается не реже этого срока.
+FEED_COUNT_TIMEOUT = 10 * 60
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+# Посты старше этого срока переносит в архив команда archive_posts.
+ARCHIVE_AFTER_DAYS = 365
+SYNDICATION_ITEMS = 50
+SYNDICATION_MAX_AGE = 5 * 60
+API_MAX_LIMIT = 100
+# Доля запросов с Server-Timing и строкой в журнале core.performance
+# (в продакшене 5%); медленные запросы журналируются всегда, со списком SQL.
+PERFORMANCE_SAMPLE_RATE = float(os.getenv('PERFORMANCE_SAMPLE_RATE', 0))
+PERFORMANCE_SLOW_REQUEST_MS = 500
+# Потоки команды generate_thumbnails.
+THUMBNAIL_WORKERS = 2
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
+# Очередь core.jobs: без воркера (run_jobs) задачи выполняются сразу,
+# в процессе запроса.
+JOBS_EAGER = True
+JOBS_BATCH_SIZE = 50
+JOBS_RETRY_DELAY = 30
+# Задачи воркера, не отчитавшегося за это время, возвращаются в очередь.
+JOBS_LEASE_SECONDS = 10 * 60
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Адрес сайта для ссылок в письмах: у фоновой задачи нет запроса.
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 CACHES = {
@@ -144,3 +192,32 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+# Общий для всех воркеров кэш: REDIS_URL=redis://host:6379/0
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES['default'] = {
+        'BACKEND': 'core.cache.backends.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'yatube',
+        'OPTIONS': {
+            'MAX_CONNECTIONS': 50,
+            'SOCKET_TIMEOUT': 1,
+            'COMPRESS_THRESHOLD': 1024,
+        },
+    }
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -0,0 +1,46 @@
+"""Профиль для продакшена: DJANGO_SETTINGS_MODULE=yatube.settings_production.
+
+Шаблоны загружаются кэширующим загрузчиком и разбираются один раз на
+процесс, при старте (``TEMPLATE_WARMUP``). База — SQLite в режиме WAL
+(``core.db.sqlite3``) с постоянными соединениями; сравнить со
+стандартными настройками: ``python manage.py bench_sqlite``. Фоновые
+задачи выполняет отдельный процесс ``python manage.py run_jobs``.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import ALLOWED_HOSTS, DATABASES, TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)).split(',')
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'debug': False,
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+TEMPLATE_WARMUP = True
+
+DATABASES = {
+    alias: {
+        **database,
+        'ENGINE': 'core.db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    }
+    for alias, database in DATABASES.items()
+}
+
+JOBS_EAGER = False
+
+PERFORMANCE_SAMPLE_RATE = float(os.getenv('PERFORMANCE_SAMPLE_RATE', 0.05))